@@ -46,6 +46,14 @@ CREATE TABLE IF NOT EXISTS labels (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Label cache keyed by a hash of prompt, model and review text,
+-- so identical reviews are not sent to the LLM again
+CREATE TABLE IF NOT EXISTS label_cache (
+    cache_key CHAR(24) PRIMARY KEY,
+    labels JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Jobs table for processing queue
 CREATE TABLE IF NOT EXISTS jobs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
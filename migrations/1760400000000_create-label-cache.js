@@ -0,0 +1,18 @@
+/**
+ * Label cache keyed by a hash of prompt, model and review text, so
+ * identical reviews are not sent to the LLM again.
+ * config/database/init.sql creates the same table on fresh databases.
+ */
+export const up = (pgm) => {
+  pgm.sql(`
+    CREATE TABLE IF NOT EXISTS label_cache (
+      cache_key CHAR(24) PRIMARY KEY,
+      labels JSONB NOT NULL,
+      created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    )
+  `);
+};
+
+export const down = (pgm) => {
+  pgm.dropTable('label_cache', { ifExists: true });
+};
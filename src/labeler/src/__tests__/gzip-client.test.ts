@@ -0,0 +1,30 @@
+import { describe, it, expect } from 'vitest';
+import { gunzipSync } from 'zlib';
+import { GzipOpenAI, GZIP_MIN_BODY_BYTES } from '../gzip-client.js';
+
+describe('GzipOpenAI', () => {
+  const client = new GzipOpenAI({ apiKey: 'test-api-key' });
+  const prepare = (request: { body: unknown; headers: Record<string, string> }) =>
+    (client as any).prepareRequest(request, { url: 'https://api.openai.com/v1/chat/completions', options: {} });
+
+  it('should gzip bodies above the size threshold', async () => {
+    const body = JSON.stringify({ text: 'a'.repeat(GZIP_MIN_BODY_BYTES * 2) });
+    const request = { body, headers: { 'content-length': String(body.length) } };
+
+    await prepare(request);
+
+    expect(request.headers['content-encoding']).toBe('gzip');
+    expect(Number(request.headers['content-length'])).toBeLessThan(body.length);
+    expect(gunzipSync(request.body as Buffer).toString('utf-8')).toBe(body);
+  });
+
+  it('should leave small bodies untouched', async () => {
+    const body = JSON.stringify({ text: 'short' });
+    const request = { body, headers: { 'content-length': String(body.length) } };
+
+    await prepare(request);
+
+    expect(request.body).toBe(body);
+    expect(request.headers['content-encoding']).toBeUndefined();
+  });
+});
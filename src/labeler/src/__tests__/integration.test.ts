@@ -15,7 +15,7 @@ vi.mock('openai', () => ({
         create: vi.fn().mockResolvedValue({
           choices: [{
             message: {
-              content: JSON.stringify([
+              content: JSON.stringify({ results: [
                 {
                   reviewId: 'test-review-1',
                   theme: 'General Feedback',
@@ -25,7 +25,7 @@ vi.mock('openai', () => ({
                   directQuote: 'test quote',
                   confidence: 0.85,
                 }
-              ])
+              ] })
             }
           }]
         }),
@@ -1,7 +1,13 @@
 import { describe, it, expect, beforeEach, vi } from 'vitest';
+import { readFileSync } from 'fs';
 import { ReviewLabeler, type LabelResult } from '../labeler.js';
 import type { Review } from '@review-scraper/shared';
 
+// Themes the labeler loads from the package's config/taxonomy.json
+const packageTaxonomy = JSON.parse(
+  readFileSync(new URL('../../config/taxonomy.json', import.meta.url), 'utf-8')
+);
+
 // Mock OpenAI
 const mockOpenAI = {
   chat: {
@@ -9,10 +15,19 @@ const mockOpenAI = {
       create: vi.fn(),
     },
   },
+  files: {
+    create: vi.fn(),
+    content: vi.fn(),
+  },
+  batches: {
+    create: vi.fn(),
+    retrieve: vi.fn(),
+  },
 };
 
 vi.mock('openai', () => ({
   default: vi.fn(() => mockOpenAI),
+  toFile: vi.fn(async (content: Buffer) => content),
 }));
 
 // Mock database pool
@@ -21,7 +36,7 @@ vi.mock('@review-scraper/shared', async () => {
   return {
     ...actual,
     getDatabasePool: vi.fn(() => ({
-      query: vi.fn(),
+      query: vi.fn().mockResolvedValue({ rows: [], rowCount: 0 }),
     })),
     Logger: vi.fn(() => ({
       info: vi.fn(),
@@ -67,6 +82,14 @@ describe('ReviewLabeler', () => {
     },
   ];
 
+  // Labeler whose database queries go to `query`; only this instance gets
+  // the mock, so later tests keep the default empty database
+  const createLabelerWithDb = async (query: (...args: any[]) => any): Promise<ReviewLabeler> => {
+    const { getDatabasePool } = await import('@review-scraper/shared');
+    vi.mocked(getDatabasePool).mockReturnValueOnce({ query } as any);
+    return new ReviewLabeler({ apiKey: 'test-api-key' });
+  };
+
   beforeEach(() => {
     vi.clearAllMocks();
     labeler = new ReviewLabeler({
@@ -74,16 +97,23 @@ describe('ReviewLabeler', () => {
     });
   });
 
+  describe('taxonomy', () => {
+    it('should load the package taxonomy file by default', () => {
+      expect((labeler as any).taxonomy.themes).toHaveLength(packageTaxonomy.themes.length);
+      expect((labeler as any).themeNames.has('Ease of Use')).toBe(true);
+    });
+  });
+
   describe('labelReviews', () => {
     it('should process reviews and return label results', async () => {
       // Mock OpenAI response
       const mockResponse = {
         choices: [{
           message: {
-            content: JSON.stringify([
+            content: JSON.stringify({ results: [
               {
                 reviewId: 'review-1',
-                theme: 'Features',
+                theme: 'Ease of Use',
                 sentiment: 'positive',
                 severity: 1,
                 featureRequest: false,
@@ -92,14 +122,14 @@ describe('ReviewLabeler', () => {
               },
               {
                 reviewId: 'review-2',
-                theme: 'Bugs/Errors',
+                theme: 'Bugs / Stability',
                 sentiment: 'negative',
                 severity: 4,
                 featureRequest: true,
                 directQuote: 'keeps crashing and login feature is broken',
                 confidence: 0.90,
               }
-            ])
+            ] })
           }
         }]
       };
@@ -111,7 +141,7 @@ describe('ReviewLabeler', () => {
       expect(results).toHaveLength(2);
       expect(results[0]).toMatchObject({
         reviewId: 'review-1',
-        theme: 'Features',
+        theme: 'Ease of Use',
         sentiment: 'positive',
         severity: 1,
         featureRequest: false,
@@ -119,7 +149,7 @@ describe('ReviewLabeler', () => {
       });
       expect(results[1]).toMatchObject({
         reviewId: 'review-2',
-        theme: 'Bugs/Errors',
+        theme: 'Bugs / Stability',
         sentiment: 'negative',
         severity: 4,
         featureRequest: true,
@@ -144,6 +174,48 @@ describe('ReviewLabeler', () => {
       });
     });
 
+    it('should retry rate-limited batches after the retry-after delay', async () => {
+      const rateLimitError = Object.assign(new Error('Rate limit reached'), {
+        status: 429,
+        headers: { 'retry-after-ms': '1' },
+      });
+
+      mockOpenAI.chat.completions.create
+        .mockRejectedValueOnce(rateLimitError)
+        .mockResolvedValueOnce({
+          choices: [{
+            message: {
+              content: JSON.stringify({ results: [
+                {
+                  reviewId: 'review-1',
+                  theme: 'Ease of Use',
+                  sentiment: 'positive',
+                  severity: 1,
+                  featureRequest: false,
+                  directQuote: 'amazing',
+                  confidence: 0.9,
+                }
+              ] })
+            }
+          }]
+        });
+
+      const results = await labeler.labelReviews([mockReviews[0]]);
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(2);
+      expect(results[0]).toMatchObject({ reviewId: 'review-1', sentiment: 'positive' });
+    });
+
+    it('should not retry bad requests', async () => {
+      const badRequestError = Object.assign(new Error('Bad request'), { status: 400 });
+      mockOpenAI.chat.completions.create.mockRejectedValue(badRequestError);
+
+      const results = await labeler.labelReviews([mockReviews[0]]);
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(1);
+      expect(results[0]).toMatchObject({ reviewId: 'review-1', confidence: 0 });
+    });
+
     it('should handle malformed OpenAI responses', async () => {
       const mockResponse = {
         choices: [{
@@ -167,7 +239,7 @@ describe('ReviewLabeler', () => {
       const mockResponse = {
         choices: [{
           message: {
-            content: JSON.stringify([
+            content: JSON.stringify({ results: [
               {
                 reviewId: 'review-1',
                 theme: 'Invalid Theme', // Should default to General Feedback
@@ -177,7 +249,7 @@ describe('ReviewLabeler', () => {
                 directQuote: 'a'.repeat(200), // Should be truncated to 100 chars
                 confidence: 2.5, // Should be clamped to 1.0
               }
-            ])
+            ] })
           }
         }]
       };
@@ -196,6 +268,137 @@ describe('ReviewLabeler', () => {
       expect(results[0].directQuote.length).toBeLessThanOrEqual(100);
     });
 
+    it('should request structured output and fill in reviews missing from the response', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{
+          message: {
+            content: JSON.stringify({ results: [
+              {
+                reviewId: 'unknown-review',
+                theme: 'General Feedback',
+                sentiment: 'positive',
+                severity: 1,
+                featureRequest: false,
+                directQuote: 'not in this batch',
+                confidence: 0.9,
+              },
+              {
+                reviewId: 'review-2',
+                theme: 'General Feedback',
+                sentiment: 'negative',
+                severity: 4,
+                featureRequest: false,
+                directQuote: 'keeps crashing',
+                confidence: 0.8,
+              }
+            ] })
+          }
+        }]
+      });
+
+      const results = await labeler.labelReviews(mockReviews);
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledWith(
+        expect.objectContaining({
+          response_format: expect.objectContaining({ type: 'json_schema' }),
+        }),
+        expect.anything()
+      );
+      expect(results.map(result => result.reviewId)).toEqual(['review-1', 'review-2']);
+      expect(results[0]).toMatchObject({ sentiment: 'neutral', confidence: 0 });
+      expect(results[1]).toMatchObject({ sentiment: 'negative', confidence: 0.8 });
+    });
+
+    it('should encode each review as a JSON line in the prompt', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{ message: { content: JSON.stringify({ results: [] }) } }]
+      });
+
+      const trickyReview = { ...mockReviews[0], text: 'Says "crashes"\non launch' };
+      await labeler.labelReviews([trickyReview]);
+
+      const request = mockOpenAI.chat.completions.create.mock.calls[0][0];
+      const lines = request.messages[1].content.split('\n');
+      expect(JSON.parse(lines[lines.length - 1])).toEqual({
+        id: 'review-1',
+        text: 'Says "crashes"\non launch',
+      });
+    });
+
+    it('should label duplicate review texts once and copy the result', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{
+          message: {
+            content: JSON.stringify({ results: [{
+              reviewId: 'review-1',
+              theme: 'Ease of Use',
+              sentiment: 'positive',
+              severity: 1,
+              featureRequest: false,
+              directQuote: 'Great app',
+              confidence: 0.9,
+            }] })
+          }
+        }]
+      });
+
+      const duplicates = [
+        { ...mockReviews[0], id: 'review-1', text: 'Great app!' },
+        { ...mockReviews[0], id: 'review-2', text: '  great APP! ' },
+      ];
+
+      const results = await labeler.labelReviews(duplicates);
+
+      const request = mockOpenAI.chat.completions.create.mock.calls[0][0];
+      expect(request.messages[1].content).not.toContain('review-2');
+      expect(results.map(result => result.reviewId)).toEqual(['review-1', 'review-2']);
+      expect(results[0]).toMatchObject({ theme: 'Ease of Use', sentiment: 'positive', confidence: 0.9 });
+      expect(results[1]).toEqual({ ...results[0], reviewId: 'review-2' });
+    });
+
+    it('should not treat blank reviews as duplicates of each other', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{ message: { content: JSON.stringify({ results: [] }) } }]
+      });
+
+      await labeler.labelReviews([
+        { ...mockReviews[0], id: 'review-1', text: '' },
+        { ...mockReviews[0], id: 'review-2', text: '   ' },
+        { ...mockReviews[0], id: 'review-3', text: null as any },
+      ]);
+
+      const userPrompt = mockOpenAI.chat.completions.create.mock.calls[0][0].messages[1].content;
+      expect(userPrompt).toContain('review-1');
+      expect(userPrompt).toContain('review-2');
+      expect(userPrompt).toContain('review-3');
+    });
+
+    it('should reuse cached labels instead of calling OpenAI', async () => {
+      const cachedLabels = {
+        theme: 'Ease of Use',
+        sentiment: 'positive',
+        severity: 1,
+        featureRequest: false,
+        directQuote: 'amazing',
+        confidence: 0.9,
+        modelVersion: 'gpt-4o-mini',
+      };
+      const mockQuery = vi.fn(async (sql: string, params: any[]) =>
+        sql.includes('SELECT cache_key')
+          ? { rows: params[0].map((key: string) => ({ cache_key: key, labels: cachedLabels })), rowCount: 1 }
+          : { rows: [], rowCount: 0 }
+      );
+      const cachingLabeler = await createLabelerWithDb(mockQuery);
+
+      const results = await cachingLabeler.labelReviews([mockReviews[0]]);
+
+      expect(mockOpenAI.chat.completions.create).not.toHaveBeenCalled();
+      expect(results[0]).toMatchObject({ reviewId: 'review-1', ...cachedLabels });
+
+      await cachingLabeler.labelReviews([mockReviews[0]], { useCache: false });
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(1);
+    });
+
     it('should process reviews in batches', async () => {
       const largeReviewSet = Array.from({ length: 25 }, (_, i) => ({
         ...mockReviews[0],
@@ -206,8 +409,8 @@ describe('ReviewLabeler', () => {
       mockOpenAI.chat.completions.create.mockResolvedValue({
         choices: [{
           message: {
-            content: JSON.stringify(
-              Array.from({ length: 20 }, (_, i) => ({
+            content: JSON.stringify({
+              results: Array.from({ length: 20 }, (_, i) => ({
                 reviewId: `review-${i}`,
                 theme: 'General Feedback',
                 sentiment: 'neutral',
@@ -216,7 +419,7 @@ describe('ReviewLabeler', () => {
                 directQuote: 'test quote',
                 confidence: 0.5,
               }))
-            )
+            })
           }
         }]
       });
@@ -227,16 +430,248 @@ describe('ReviewLabeler', () => {
       expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(2);
       expect(results).toHaveLength(25);
     });
+
+    it('should send a byte-identical system prompt for every batch', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{ message: { content: JSON.stringify({ results: [] }) } }]
+      });
+
+      await labeler.labelReviews(mockReviews, { batchSize: 1 });
+
+      const [first, second] = mockOpenAI.chat.completions.create.mock.calls.map(
+        ([request]) => request.messages
+      );
+      expect(first[0]).toEqual(second[0]);
+      for (const theme of packageTaxonomy.themes) {
+        expect(first[0].content).toContain(theme.name);
+      }
+      expect(first[1].content).not.toEqual(second[1].content);
+    });
+
+    it('should close batches early once they reach the target prompt size', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{ message: { content: JSON.stringify({ results: [] }) } }]
+      });
+
+      // ~265 estimated tokens each, so only two fit under a 600 token target
+      const longReviews = Array.from({ length: 5 }, (_, i) => ({
+        ...mockReviews[0],
+        id: `review-${i}`,
+        text: `${i}`.padEnd(1000, 'x'),
+      }));
+
+      await labeler.labelReviews(longReviews, { batchSize: 50, targetPromptTokens: 600 });
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(3);
+    });
+
+    it('should limit in-flight batches to the configured concurrency', async () => {
+      let inFlight = 0;
+      let maxInFlight = 0;
+
+      mockOpenAI.chat.completions.create.mockImplementation(async () => {
+        inFlight++;
+        maxInFlight = Math.max(maxInFlight, inFlight);
+        await new Promise(resolve => setTimeout(resolve, 10));
+        inFlight--;
+        return { choices: [{ message: { content: JSON.stringify({ results: [] }) } }] };
+      });
+
+      const reviews = Array.from({ length: 3 }, (_, i) => ({
+        ...mockReviews[0],
+        id: `review-${i}`,
+        text: `Review text ${i}`,
+      }));
+
+      await labeler.labelReviews(reviews, { batchSize: 1, concurrency: 2 });
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(3);
+      expect(maxInFlight).toBe(2);
+    });
+
+    it('should abort instead of retrying when results cannot be stored', async () => {
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        choices: [{ message: { content: JSON.stringify({ results: [] }) } }]
+      });
+      const onResults = vi.fn().mockRejectedValue(new Error('Database error'));
+
+      await expect(
+        labeler.labelReviews(mockReviews, { batchSize: 1, concurrency: 1, onResults })
+      ).rejects.toThrow('Database error');
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(1);
+      expect(onResults).toHaveBeenCalledTimes(1);
+    });
+  });
+
+  describe('streaming', () => {
+    const streamedResult = (reviewId: string) => JSON.stringify({
+      reviewId,
+      theme: 'Ease of Use',
+      sentiment: 'positive',
+      severity: 1,
+      featureRequest: false,
+      directQuote: 'amazing',
+      confidence: 0.9,
+    });
+
+    const streamOf = (chunks: string[], error?: Error) => ({
+      async *[Symbol.asyncIterator]() {
+        for (const content of chunks) {
+          yield { choices: [{ delta: { content } }] };
+        }
+        if (error) {
+          throw error;
+        }
+      },
+    });
+
+    it('should hand over each result as soon as it has streamed in', async () => {
+      const delivered: string[][] = [];
+      let seenBeforeSecond: string[] = [];
+
+      mockOpenAI.chat.completions.create.mockResolvedValue({
+        async *[Symbol.asyncIterator]() {
+          yield { choices: [{ delta: { content: `{"results":[${streamedResult('review-1')},` } }] };
+          seenBeforeSecond = delivered.flat();
+          yield { choices: [{ delta: { content: `${streamedResult('review-2')}]}` } }] };
+        },
+      });
+
+      const results = await labeler.labelReviews(mockReviews, {
+        stream: true,
+        onResults: results => { delivered.push(results.map(result => result.reviewId)); },
+      });
+
+      expect(mockOpenAI.chat.completions.create.mock.calls[0][0].stream).toBe(true);
+      expect(seenBeforeSecond).toEqual(['review-1']);
+      expect(delivered).toEqual([['review-1'], ['review-2']]);
+      expect(results.map(result => result.sentiment)).toEqual(['positive', 'positive']);
+    });
+
+    it('should only retry the reviews a broken stream had not delivered', async () => {
+      const connectionError = Object.assign(new Error('Connection reset'), { name: 'APIConnectionError' });
+
+      mockOpenAI.chat.completions.create
+        .mockResolvedValueOnce(streamOf([`{"results":[${streamedResult('review-1')},{"revie`], connectionError))
+        .mockResolvedValueOnce(streamOf([`{"results":[${streamedResult('review-2')}]}`]));
+
+      const onResults = vi.fn();
+      const results = await labeler.labelReviews(mockReviews, { stream: true, onResults });
+
+      const retryPrompt = mockOpenAI.chat.completions.create.mock.calls[1][0].messages[1].content;
+      expect(retryPrompt).toContain('review-2');
+      expect(retryPrompt).not.toContain('review-1');
+      expect(onResults).toHaveBeenCalledTimes(2);
+      expect(results.map(result => result.confidence)).toEqual([0.9, 0.9]);
+    });
+
+    it('should not send another request when a broken stream already delivered everything', async () => {
+      const connectionError = Object.assign(new Error('Connection reset'), { name: 'APIConnectionError' });
+      mockOpenAI.chat.completions.create.mockResolvedValueOnce(streamOf(
+        [`{"results":[${streamedResult('review-1')},${streamedResult('review-2')}]`],
+        connectionError
+      ));
+
+      const results = await labeler.labelReviews(mockReviews, { stream: true });
+
+      expect(mockOpenAI.chat.completions.create).toHaveBeenCalledTimes(1);
+      expect(results.map(result => result.confidence)).toEqual([0.9, 0.9]);
+    });
+  });
+
+  describe('batch mode', () => {
+    it('should label reviews through the OpenAI Batch API', async () => {
+      mockOpenAI.files.create.mockResolvedValue({ id: 'file-input' });
+      mockOpenAI.batches.create.mockResolvedValue({ id: 'batch-1', status: 'validating' });
+      mockOpenAI.batches.retrieve.mockResolvedValue({
+        id: 'batch-1',
+        status: 'completed',
+        output_file_id: 'file-output',
+      });
+
+      const completion = (reviewId: string) => ({
+        choices: [{
+          message: {
+            content: JSON.stringify({ results: [{
+              reviewId,
+              theme: 'General Feedback',
+              sentiment: 'positive',
+              severity: 1,
+              featureRequest: false,
+              directQuote: 'amazing',
+              confidence: 0.9,
+            }] })
+          }
+        }]
+      });
+      mockOpenAI.files.content.mockResolvedValue({
+        text: async () => [
+          JSON.stringify({ custom_id: 'batch-0', response: { status_code: 200, body: completion('review-1') } }),
+          JSON.stringify({ custom_id: 'batch-1', response: { status_code: 500, body: {} } }),
+        ].join('\n'),
+      });
+
+      const results = await labeler.labelReviews(mockReviews, {
+        mode: 'batch',
+        batchSize: 1,
+        batchPollIntervalMs: 1,
+      });
+
+      expect(mockOpenAI.chat.completions.create).not.toHaveBeenCalled();
+      expect(mockOpenAI.batches.create).toHaveBeenCalledWith(expect.objectContaining({
+        input_file_id: 'file-input',
+        endpoint: '/v1/chat/completions',
+      }), { maxRetries: 3 });
+      // The shared client never retries, so every Batch API call opts in
+      expect(mockOpenAI.batches.retrieve).toHaveBeenCalledWith('batch-1', { maxRetries: 3 });
+      expect(mockOpenAI.files.content).toHaveBeenCalledWith('file-output', { maxRetries: 3 });
+      expect(results[0]).toMatchObject({ reviewId: 'review-1', sentiment: 'positive', confidence: 0.9 });
+      expect(results[1]).toMatchObject({ reviewId: 'review-2', confidence: 0 });
+    });
+
+    it('should keep the rest of the output when one line is unparseable', async () => {
+      mockOpenAI.files.create.mockResolvedValue({ id: 'file-input' });
+      mockOpenAI.batches.create.mockResolvedValue({
+        id: 'batch-1',
+        status: 'completed',
+        output_file_id: 'file-output',
+        error_file_id: 'file-errors',
+      });
+
+      const completion = {
+        choices: [{
+          message: {
+            content: JSON.stringify({ results: [{
+              reviewId: 'review-2',
+              theme: 'General Feedback',
+              sentiment: 'negative',
+              severity: 3,
+              featureRequest: false,
+              directQuote: 'keeps crashing',
+              confidence: 0.8,
+            }] })
+          }
+        }]
+      };
+      mockOpenAI.files.content.mockResolvedValue({
+        text: async () => [
+          '{"custom_id": "batch-0", "response": {"status_co',
+          JSON.stringify({ custom_id: 'batch-1', response: { status_code: 200, body: completion } }),
+        ].join('\n'),
+      });
+
+      const results = await labeler.labelReviews(mockReviews, { mode: 'batch', batchSize: 1 });
+
+      expect(results[0]).toMatchObject({ reviewId: 'review-1', confidence: 0 });
+      expect(results[1]).toMatchObject({ reviewId: 'review-2', sentiment: 'negative', confidence: 0.8 });
+    });
   });
 
   describe('saveLabelResults', () => {
     it('should save results to database', async () => {
       const mockQuery = vi.fn().mockResolvedValue({ rows: [] });
-      const mockDb = { query: mockQuery };
-      
-      // Mock getDatabasePool to return our mock
-      const { getDatabasePool } = await import('@review-scraper/shared');
-      vi.mocked(getDatabasePool).mockReturnValue(mockDb as any);
+      const labeler = await createLabelerWithDb(mockQuery);
 
       const labelResults: LabelResult[] = [
         {
@@ -269,12 +704,37 @@ describe('ReviewLabeler', () => {
       );
     });
 
+    it('should upsert a chunk of labels in one query', async () => {
+      const mockQuery = vi.fn().mockResolvedValue({ rows: [], rowCount: 2 });
+      const batchLabeler = await createLabelerWithDb(mockQuery);
+
+      const result: LabelResult = {
+        reviewId: 'review-1',
+        theme: 'Ease of Use',
+        sentiment: 'positive',
+        severity: 1,
+        featureRequest: false,
+        directQuote: 'great app',
+        confidence: 0.95,
+        modelVersion: 'gpt-4o-mini',
+      };
+
+      await batchLabeler.saveLabelResults([
+        result,
+        { ...result, reviewId: 'review-2' },
+        { ...result, reviewId: 'review-1', sentiment: 'negative' },
+      ]);
+
+      expect(mockQuery).toHaveBeenCalledTimes(1);
+      const [sql, params] = mockQuery.mock.calls[0];
+      expect(sql).toContain('$18, NOW())');
+      expect(params).toHaveLength(18);
+      expect(params).toContain('negative');
+    });
+
     it('should handle database errors gracefully', async () => {
       const mockQuery = vi.fn().mockRejectedValue(new Error('DB Error'));
-      const mockDb = { query: mockQuery };
-      
-      const { getDatabasePool } = await import('@review-scraper/shared');
-      vi.mocked(getDatabasePool).mockReturnValue(mockDb as any);
+      const labeler = await createLabelerWithDb(mockQuery);
 
       const labelResults: LabelResult[] = [
         {
@@ -293,6 +753,21 @@ describe('ReviewLabeler', () => {
     });
   });
 
+  describe('getLabeledReviewIds', () => {
+    it('should only count real labels from the requested model', async () => {
+      const mockQuery = vi.fn().mockResolvedValue({ rows: [{ review_id: 'review-1' }] });
+      const labeler = await createLabelerWithDb(mockQuery);
+
+      const labeledIds = await labeler.getLabeledReviewIds(['review-1', 'review-2'], 'gpt-4o');
+
+      const [sql, params] = mockQuery.mock.calls[0];
+      expect(sql).toContain('confidence > 0');
+      expect(sql).toContain('model_version = $2');
+      expect(params).toEqual([['review-1', 'review-2'], 'gpt-4o']);
+      expect([...labeledIds]).toEqual(['review-1']);
+    });
+  });
+
   describe('getUnlabeledReviews', () => {
     it('should fetch unlabeled reviews from database', async () => {
       const mockQuery = vi.fn().mockResolvedValue({
@@ -314,17 +789,16 @@ describe('ReviewLabeler', () => {
           }
         ]
       });
-      const mockDb = { query: mockQuery };
-      
-      const { getDatabasePool } = await import('@review-scraper/shared');
-      vi.mocked(getDatabasePool).mockReturnValue(mockDb as any);
+      const labeler = await createLabelerWithDb(mockQuery);
 
       const reviews = await labeler.getUnlabeledReviews(10);
 
       expect(mockQuery).toHaveBeenCalledWith(
-        expect.stringContaining('SELECT r.* FROM reviews r'),
+        expect.stringContaining('FROM reviews r'),
         [10]
       );
+      // Blank reviews are filtered out by the query itself
+      expect(mockQuery.mock.calls[0][0]).toContain("btrim(coalesce(r.text, '')) <> ''");
       expect(reviews).toHaveLength(1);
       expect(reviews[0]).toMatchObject({
         id: 'review-1',
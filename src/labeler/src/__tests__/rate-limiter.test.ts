@@ -0,0 +1,76 @@
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+import { OpenAIRateLimiter, estimateTokens, parseRetryAfterMs } from '../rate-limiter.js';
+
+describe('OpenAIRateLimiter', () => {
+  beforeEach(() => {
+    vi.useFakeTimers();
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+  });
+
+  it('should dispatch immediately while both buckets have capacity', async () => {
+    const limiter = new OpenAIRateLimiter({ maxRequestsPerMinute: 60, maxTokensPerMinute: 1000 });
+
+    await expect(limiter.acquire(500)).resolves.toBeUndefined();
+    await expect(limiter.acquire(500)).resolves.toBeUndefined();
+  });
+
+  it('should wait for the token bucket to refill', async () => {
+    const limiter = new OpenAIRateLimiter({ maxRequestsPerMinute: 60, maxTokensPerMinute: 600 });
+    await limiter.acquire(600);
+
+    let acquired = false;
+    const pending = limiter.acquire(60).then(() => { acquired = true; });
+
+    // 600 TPM refills 60 tokens every 6 seconds
+    await vi.advanceTimersByTimeAsync(5000);
+    expect(acquired).toBe(false);
+
+    await vi.advanceTimersByTimeAsync(1500);
+    await pending;
+    expect(acquired).toBe(true);
+  });
+
+  it('should hold requests back while paused after a rate limit', async () => {
+    const limiter = new OpenAIRateLimiter({ maxRequestsPerMinute: 6000, maxTokensPerMinute: 1000000 });
+    limiter.pause(2000);
+
+    let acquired = false;
+    const pending = limiter.acquire(10).then(() => { acquired = true; });
+
+    await vi.advanceTimersByTimeAsync(1900);
+    expect(acquired).toBe(false);
+
+    await vi.advanceTimersByTimeAsync(200);
+    await pending;
+    expect(acquired).toBe(true);
+  });
+});
+
+describe('parseRetryAfterMs', () => {
+  it('should prefer retry-after-ms, then retry-after seconds', () => {
+    expect(parseRetryAfterMs({ 'retry-after-ms': '250', 'retry-after': '3' })).toBe(250);
+    expect(parseRetryAfterMs({ 'retry-after': '3' })).toBe(3000);
+  });
+
+  it('should fall back to the longest x-ratelimit-reset duration', () => {
+    expect(parseRetryAfterMs({
+      'x-ratelimit-reset-requests': '1s',
+      'x-ratelimit-reset-tokens': '6m0s',
+    })).toBe(360000);
+    expect(parseRetryAfterMs({ 'x-ratelimit-reset-tokens': '120ms' })).toBe(120);
+  });
+
+  it('should return undefined without usable headers', () => {
+    expect(parseRetryAfterMs(undefined)).toBeUndefined();
+    expect(parseRetryAfterMs({ 'content-type': 'application/json' })).toBeUndefined();
+  });
+});
+
+describe('estimateTokens', () => {
+  it('should estimate roughly four characters per token', () => {
+    expect(estimateTokens('a'.repeat(400))).toBe(100);
+  });
+});
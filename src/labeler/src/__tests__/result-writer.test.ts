@@ -0,0 +1,53 @@
+import { describe, it, expect, vi } from 'vitest';
+import { LabelResultWriter } from '../result-writer.js';
+import type { LabelResult } from '../labeler.js';
+
+const result = (reviewId: string): LabelResult => ({
+  reviewId,
+  theme: 'General Feedback',
+  sentiment: 'neutral',
+  severity: 1,
+  featureRequest: false,
+  directQuote: '',
+  confidence: 0.5,
+  modelVersion: 'gpt-4o-mini',
+});
+
+describe('LabelResultWriter', () => {
+  it('should coalesce results queued during a write into the next one', async () => {
+    let finishFirstWrite!: () => void;
+    const save = vi.fn()
+      .mockImplementationOnce(() => new Promise<void>(resolve => { finishFirstWrite = resolve; }))
+      .mockResolvedValue(undefined);
+    const writer = new LabelResultWriter(save);
+
+    await writer.write([result('r1')]);
+    await writer.write([result('r2')]);
+    await writer.write([result('r3')]);
+    finishFirstWrite();
+    await writer.close();
+
+    expect(save).toHaveBeenCalledTimes(2);
+    expect(save.mock.calls[0][0].map((r: LabelResult) => r.reviewId)).toEqual(['r1']);
+    expect(save.mock.calls[1][0].map((r: LabelResult) => r.reviewId)).toEqual(['r2', 'r3']);
+  });
+
+  it('should report write failures on close', async () => {
+    const writer = new LabelResultWriter(vi.fn().mockRejectedValue(new Error('Database error')));
+
+    await writer.write([result('r1')]);
+
+    await expect(writer.close()).rejects.toThrow('Database error');
+  });
+
+  it('should reject further writes once a write has failed', async () => {
+    const save = vi.fn().mockRejectedValue(new Error('Database error'));
+    const writer = new LabelResultWriter(save);
+
+    await writer.write([result('r1')]);
+    await expect(writer.close()).rejects.toThrow('Database error');
+
+    await expect(writer.write([result('r2')])).rejects.toThrow('Database error');
+    expect(save).toHaveBeenCalledTimes(1);
+  });
+});
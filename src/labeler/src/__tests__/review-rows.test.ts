@@ -0,0 +1,98 @@
+import { describe, it, expect, beforeEach, afterEach, vi } from 'vitest';
+
+// Each test gets a fresh module so the interned pool starts out empty
+const loadReviewRows = () => import('../review-rows.js');
+
+describe('review rows', () => {
+  let mapSet: ReturnType<typeof vi.spyOn>;
+
+  // Entries added to the intern pool, found as the map the given value went into
+  const poolInsertions = (pooledValue: string): unknown[] => {
+    const poolIndex = mapSet.mock.calls.findIndex(([key]) => key === pooledValue);
+    const pool = mapSet.mock.contexts[poolIndex];
+    return mapSet.mock.calls
+      .filter((_, i) => mapSet.mock.contexts[i] === pool)
+      .map(([key]) => key);
+  };
+
+  beforeEach(() => {
+    vi.resetModules();
+    mapSet = vi.spyOn(Map.prototype, 'set');
+  });
+
+  afterEach(() => {
+    mapSet.mockRestore();
+  });
+
+  describe('internString', () => {
+    it('should return the same value and pool it only once', async () => {
+      const { internString } = await loadReviewRows();
+
+      expect(internString('US')).toBe('US');
+      expect(internString(['U', 'S'].join(''))).toBe('US');
+
+      expect(poolInsertions('US')).toEqual(['US']);
+    });
+
+    it('should pass null and undefined through', async () => {
+      const { internString } = await loadReviewRows();
+
+      expect(internString(null)).toBeNull();
+      expect(internString(undefined)).toBeUndefined();
+      internString('US');
+
+      expect(poolInsertions('US')).toEqual(['US']);
+    });
+
+    it('should stop pooling new values once the cap is reached', async () => {
+      const { internString, MAX_INTERNED_STRINGS } = await loadReviewRows();
+
+      for (let i = 0; i < MAX_INTERNED_STRINGS; i++) {
+        internString(`value-${i}`);
+      }
+      expect(internString('one-too-many')).toBe('one-too-many');
+
+      const inserted = poolInsertions('value-0');
+      expect(inserted).toHaveLength(MAX_INTERNED_STRINGS);
+      expect(inserted).not.toContain('one-too-many');
+    });
+  });
+
+  describe('mapReviewRow', () => {
+    it('should map snake_case columns to a Review', async () => {
+      const { mapReviewRow } = await loadReviewRows();
+
+      const review = mapReviewRow({
+        id: 'review-1',
+        user_name: 'Jane',
+        user_url: null,
+        version: '3.4.1',
+        score: 5,
+        title: 'Great',
+        text: 'Works well',
+        url: null,
+        date: '2024-01-01',
+        reply_date: null,
+        reply_text: null,
+        helpful_votes: 2,
+        country: 'US',
+      });
+
+      expect(review).toEqual({
+        id: 'review-1',
+        userName: 'Jane',
+        userUrl: null,
+        version: '3.4.1',
+        score: 5,
+        title: 'Great',
+        text: 'Works well',
+        url: null,
+        date: '2024-01-01',
+        replyDate: null,
+        replyText: null,
+        helpfulVotes: 2,
+        country: 'US',
+      });
+    });
+  });
+});
@@ -0,0 +1,21 @@
+import { describe, it, expect } from 'vitest';
+import { StreamingResultsParser } from '../stream-parser.js';
+
+describe('StreamingResultsParser', () => {
+  it('should emit each result once its object has fully streamed in', () => {
+    const parser = new StreamingResultsParser();
+
+    expect(parser.push('{"results":[{"reviewId":"r1","directQuote":"so')).toEqual([]);
+    expect(parser.push(' {good}"},{"reviewId"')).toEqual([{ reviewId: 'r1', directQuote: 'so {good}' }]);
+    expect(parser.push(':"r2","directQuote":"say \\"hi\\""}]}')).toEqual([
+      { reviewId: 'r2', directQuote: 'say "hi"' },
+    ]);
+  });
+
+  it('should handle a whole completion in a single chunk', () => {
+    const parser = new StreamingResultsParser();
+    const content = JSON.stringify({ results: [{ reviewId: 'r1' }, { reviewId: 'r2' }] });
+
+    expect(parser.push(content)).toEqual([{ reviewId: 'r1' }, { reviewId: 'r2' }]);
+  });
+});
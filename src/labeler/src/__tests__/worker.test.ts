@@ -7,6 +7,7 @@ const mockLabeler = {
   labelReviews: vi.fn(),
   saveLabelResults: vi.fn(),
   getUnlabeledReviews: vi.fn(),
+  getLabeledReviewIds: vi.fn().mockResolvedValue(new Set()),
 };
 
 // Mock ReviewLabeler class
@@ -124,7 +125,10 @@ describe('LabelerWorker', () => {
         },
       ];
 
-      mockLabeler.labelReviews.mockResolvedValue(mockLabelResults);
+      mockLabeler.labelReviews.mockImplementation(async (_reviews, config) => {
+        await config.onResults(mockLabelResults);
+        return mockLabelResults;
+      });
       mockLabeler.saveLabelResults.mockResolvedValue(undefined);
 
       const result = await worker.processLabelingJob(mockJob as Job<LabelReviewsJob>);
@@ -149,14 +153,62 @@ describe('LabelerWorker', () => {
           expect.objectContaining({ id: 'review-1' }),
           expect.objectContaining({ id: 'review-2' }),
         ]),
-        {
+        expect.objectContaining({
           batchSize: 20,
           model: 'gpt-4o-mini',
-        }
+        })
       );
       expect(mockLabeler.saveLabelResults).toHaveBeenCalledWith(mockLabelResults);
     });
 
+    it('should skip reviews that already have labels', async () => {
+      mockLabeler.getLabeledReviewIds.mockResolvedValueOnce(new Set(['review-1']));
+      mockLabeler.labelReviews.mockResolvedValue([]);
+      mockLabeler.saveLabelResults.mockResolvedValue(undefined);
+
+      await worker.processLabelingJob(mockJob as Job<LabelReviewsJob>);
+
+      expect(mockLabeler.getLabeledReviewIds).toHaveBeenCalledWith(['review-1', 'review-2'], 'gpt-4o-mini');
+      expect(mockLabeler.labelReviews).toHaveBeenCalledWith(
+        [expect.objectContaining({ id: 'review-2' })],
+        expect.any(Object)
+      );
+    });
+
+    it('should drop blank reviews in SQL and log one aggregate skip count', async () => {
+      const mockQuery = vi.fn().mockResolvedValue({
+        rows: [{ id: 'review-1', text: 'Great app!', country: 'US' }],
+      });
+      (worker as any).db = { query: mockQuery };
+      mockLabeler.labelReviews.mockResolvedValue([]);
+      mockJob.data!.reviewIds = ['review-1', 'review-2', 'review-3'];
+
+      await worker.processLabelingJob(mockJob as Job<LabelReviewsJob>);
+
+      const [sql, params] = mockQuery.mock.calls[0];
+      expect(sql).toContain("btrim(coalesce(text, '')) <> ''");
+      expect(params).toEqual([['review-1', 'review-2', 'review-3']]);
+
+      const skipLogs = (worker as any).logger.info.mock.calls
+        .filter(([message]: [string]) => message.startsWith('Skipped'));
+      expect(skipLogs).toEqual([[expect.stringContaining('Skipped 2/3 requested reviews')]]);
+    });
+
+    it('should not count repeated review IDs as skipped', async () => {
+      const mockQuery = vi.fn().mockResolvedValue({
+        rows: [{ id: 'review-1', text: 'Great app!', country: 'US' }],
+      });
+      (worker as any).db = { query: mockQuery };
+      mockLabeler.labelReviews.mockResolvedValue([]);
+      mockJob.data!.reviewIds = ['review-1', 'review-1'];
+
+      await worker.processLabelingJob(mockJob as Job<LabelReviewsJob>);
+
+      const skipLogs = (worker as any).logger.info.mock.calls
+        .filter(([message]: [string]) => message.startsWith('Skipped'));
+      expect(skipLogs).toEqual([]);
+    });
+
     it('should handle case when no reviews are found', async () => {
       const mockDb = {
         query: vi.fn().mockResolvedValue({ rows: [] })
@@ -200,7 +252,10 @@ describe('LabelerWorker', () => {
         },
       ];
 
-      mockLabeler.labelReviews.mockResolvedValue(mockLabelResults);
+      mockLabeler.labelReviews.mockImplementation(async (_reviews, config) => {
+        await config.onResults(mockLabelResults);
+        return mockLabelResults;
+      });
       mockLabeler.saveLabelResults.mockRejectedValue(new Error('Database error'));
 
       const result = await worker.processLabelingJob(mockJob as Job<LabelReviewsJob>);
@@ -269,6 +324,33 @@ describe('LabelerWorker', () => {
       expect(mockLabeler.getUnlabeledReviews).toHaveBeenCalledWith(10);
     });
 
+    it('should label unlabeled reviews one window at a time', async () => {
+      process.env.LABELER_WINDOW_SIZE = '2';
+      const windowOf = (ids: string[]) => ids.map(id => ({ id, text: `Review ${id}` }));
+      const resultsFor = (reviews: { id: string }[]) => reviews.map(review => ({
+        reviewId: review.id,
+        sentiment: 'positive',
+        confidence: 0.8,
+      }));
+
+      mockLabeler.getUnlabeledReviews
+        .mockResolvedValueOnce(windowOf(['r1', 'r2']))
+        .mockResolvedValueOnce(windowOf(['r3', 'r4']))
+        .mockResolvedValueOnce(windowOf(['r5']));
+      mockLabeler.labelReviews.mockImplementation(async reviews => resultsFor(reviews));
+
+      const result = await worker.processUnlabeledReviews(5);
+      delete process.env.LABELER_WINDOW_SIZE;
+
+      expect(mockLabeler.getUnlabeledReviews.mock.calls).toEqual([[2], [2], [1]]);
+      expect(mockLabeler.labelReviews).toHaveBeenCalledTimes(3);
+      expect(result.itemsProcessed).toBe(5);
+      expect(result.data).toMatchObject({
+        averageConfidence: 0.8,
+        sentimentBreakdown: { positive: 5, neutral: 0, negative: 0 },
+      });
+    });
+
     it('should handle case when no unlabeled reviews exist', async () => {
       mockLabeler.getUnlabeledReviews.mockResolvedValue([]);
 
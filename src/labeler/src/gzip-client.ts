@@ -0,0 +1,36 @@
+import OpenAI from 'openai';
+import { gzipSync } from 'zlib';
+
+/**
+ * Bodies smaller than this aren't worth the CPU to compress
+ */
+export const GZIP_MIN_BODY_BYTES = 2048;
+
+type PrepareRequestArgs = Parameters<OpenAI['prepareRequest']>;
+
+/**
+ * OpenAI client that gzips large request bodies.
+ * Labeling requests carry the taxonomy plus a batch of review texts, so
+ * compressing them cuts bytes on the wire for bandwidth-limited deployments.
+ * Hooks the SDK's prepareRequest, which runs after the body and headers are
+ * built (including on retries).
+ */
+export class GzipOpenAI extends OpenAI {
+  protected override async prepareRequest(
+    request: PrepareRequestArgs[0],
+    context: PrepareRequestArgs[1]
+  ): Promise<void> {
+    await super.prepareRequest(request, context);
+
+    if (typeof request.body !== 'string' || Buffer.byteLength(request.body) <= GZIP_MIN_BODY_BYTES) {
+      return;
+    }
+
+    const compressed = gzipSync(request.body);
+    const headers = request.headers as Record<string, string>;
+
+    request.body = compressed;
+    headers['content-encoding'] = 'gzip';
+    headers['content-length'] = String(compressed.length);
+  }
+}
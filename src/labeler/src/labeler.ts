@@ -1,5 +1,7 @@
-import OpenAI from 'openai';
+import OpenAI, { toFile } from 'openai';
 import { readFileSync } from 'fs';
+import { Agent } from 'https';
+import { createHash, Hash } from 'crypto';
 import { join, dirname } from 'path';
 import { fileURLToPath } from 'url';
 import { 
@@ -8,10 +10,70 @@ import {
   DatabasePool, 
   getDatabasePool 
 } from '@review-scraper/shared';
+import {
+  OpenAIRateLimiter,
+  OUTPUT_TOKENS_PER_REVIEW,
+  estimateTokens,
+  parseRetryAfterMs,
+} from './rate-limiter.js';
+import { hasReviewText, mapReviewRow, selectReviewColumns } from './review-rows.js';
+import { GzipOpenAI } from './gzip-client.js';
+import { StreamingResultsParser } from './stream-parser.js';
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 
+/**
+ * Estimated tokens each review adds to the prompt besides its text (ID, JSON keys and quoting)
+ */
+const REVIEW_PROMPT_OVERHEAD_TOKENS = 15;
+
+/**
+ * Per-request retries for Batch API calls. The shared client has
+ * maxRetries: 0 because online batches retry in processBatch, but a lost
+ * upload or poll would abandon a job OpenAI keeps running and billing.
+ */
+const BATCH_API_REQUEST_OPTIONS = { maxRetries: 3 };
+
+/**
+ * Static prompt text, kept as plain strings so building a prompt is
+ * concatenation rather than re-running a template per batch
+ */
+const SYSTEM_PROMPT_HEADER = `You are a meticulous analyst focused on extracting structured data from app reviews. 
+
+Analyze each review based on this taxonomy:
+`;
+
+const SYSTEM_PROMPT_RULES = `
+
+For EACH review, identify:
+1. ONE primary theme from the taxonomy (use "General Feedback" if none fit)
+2. Sentiment: positive | neutral | negative  
+3. Severity: 1-5 scale (1=minor, 5=critical, use 1 for positive/neutral)
+4. Feature request: true/false (user explicitly suggests adding/improving a feature)
+5. Direct quote: extract 1-20 words that best represent the sentiment
+
+Return one entry in "results" per review, using the review's ID as reviewId
+and a confidence between 0.0 and 1.0.`;
+
+const USER_PROMPT_HEADER = 'Analyze these app reviews (one JSON object per line):\n\n';
+
+/**
+ * Key used to detect duplicate review texts
+ */
+function normalizeReviewText(text: string | null | undefined): string {
+  return (text || '').trim().toLowerCase();
+}
+
+/**
+ * Dedup group of a review. Blank reviews have nothing in common to share a
+ * label over, so each gets a group of its own; the NUL prefix keeps those
+ * keys apart from real texts, which Postgres text never contains.
+ */
+function duplicateKey(review: Review): string {
+  return normalizeReviewText(review.text) || `\0${review.id}`;
+}
+
 /**
  * Sentiment analysis results for a review
  */
@@ -31,11 +93,23 @@ export interface LabelResult {
  */
 export interface LabelingConfig {
   model: string;
-  batchSize: number;
+  batchSize: number; // Max reviews per request
+  targetPromptTokens: number; // Close a batch early once its reviews reach this size
+  concurrency: number; // Max OpenAI requests in flight
   maxRetries: number;
   timeoutMs: number;
+  mode: 'online' | 'batch'; // 'batch' uses the OpenAI Batch API
+  batchPollIntervalMs: number;
+  useCache: boolean; // Reuse labels stored for identical prompt + review text
+  stream: boolean; // Stream completions and hand results over as each one arrives
+  onResults?: ResultsCallback; // Receives results as soon as they are available
 }
 
+/**
+ * Receives labeled results before labelReviews resolves
+ */
+export type ResultsCallback = (results: LabelResult[]) => void | Promise<void>;
+
 /**
  * Node.js implementation of review sentiment analysis
  * Replaces the Python batch_label_reviews.py with better integration
@@ -45,20 +119,71 @@ export class ReviewLabeler {
   private logger: Logger;
   private db: DatabasePool;
   private taxonomy: any;
+  private taxonomyJson: string;
+  private themeNames: ReadonlySet<string>;
+  private systemPrompt: string;
+  private systemPromptTokens: number;
+  private cacheKeyPrefix: Hash;
+  private responseFormat: OpenAI.Chat.ChatCompletionCreateParamsNonStreaming['response_format'];
+  private rateLimiter: OpenAIRateLimiter;
+  private httpAgent: Agent;
 
   constructor(config: {
     apiKey: string;
     taxonomyPath?: string;
+    maxRequestsPerMinute?: number;
+    maxTokensPerMinute?: number;
+    maxConnections?: number;
+    compressRequests?: boolean;
   }) {
     this.logger = new Logger('ReviewLabeler');
     this.db = getDatabasePool();
-    
-    this.openai = new OpenAI({
+
+    // One long-lived keep-alive pool so concurrent batches reuse warm TLS
+    // connections instead of handshaking per request
+    const maxConnections = config.maxConnections || 8;
+    this.httpAgent = new Agent({
+      keepAlive: true,
+      keepAliveMsecs: 30000,
+      maxSockets: maxConnections,
+      maxFreeSockets: maxConnections,
+    });
+
+    const OpenAIClient = config.compressRequests ? GzipOpenAI : OpenAI;
+    this.openai = new OpenAIClient({
       apiKey: config.apiKey,
+      httpAgent: this.httpAgent,
+      maxRetries: 0, // Retries are handled per batch in processBatch
+    });
+
+    // Shared across calls so concurrent jobs on this labeler draw from one quota
+    this.rateLimiter = new OpenAIRateLimiter({
+      maxRequestsPerMinute: config.maxRequestsPerMinute || 500,
+      maxTokensPerMinute: config.maxTokensPerMinute || 200000,
     });
 
     // Load taxonomy from file or use default
     this.taxonomy = this.loadTaxonomy(config.taxonomyPath);
+
+    // Parsed once: minified JSON keeps the prompt small, and the set gives
+    // O(1) theme validation for every result
+    this.taxonomyJson = JSON.stringify(this.taxonomy);
+    this.themeNames = new Set<string>([
+      ...(this.taxonomy.themes || []).map((theme: { name: string }) => theme.name),
+      'General Feedback',
+    ]);
+
+    this.systemPrompt = this.buildSystemPrompt();
+    this.systemPromptTokens = estimateTokens(this.systemPrompt);
+    this.cacheKeyPrefix = createHash('blake2b512').update(this.systemPrompt);
+    this.responseFormat = {
+      type: 'json_schema',
+      json_schema: {
+        name: 'batch_labels',
+        strict: true,
+        schema: this.buildResponseSchema(),
+      },
+    };
   }
 
   /**
@@ -70,55 +195,279 @@ export class ReviewLabeler {
   ): Promise<LabelResult[]> {
     const finalConfig: LabelingConfig = {
       model: 'gpt-4o-mini',
-      batchSize: 20,
+      batchSize: 50,
+      targetPromptTokens: 6000,
+      concurrency: 4,
       maxRetries: 3,
       timeoutMs: 120000,
+      mode: 'online',
+      batchPollIntervalMs: 60000,
+      useCache: true,
+      stream: false,
       ...config,
     };
 
     this.logger.info(`Starting to label ${reviews.length} reviews`, {
       model: finalConfig.model,
       batchSize: finalConfig.batchSize,
+      targetPromptTokens: finalConfig.targetPromptTokens,
+      concurrency: finalConfig.concurrency,
+      mode: finalConfig.mode,
     });
 
-    const results: LabelResult[] = [];
-    
-    // Process reviews in batches
-    for (let i = 0; i < reviews.length; i += finalConfig.batchSize) {
-      const batch = reviews.slice(i, i + finalConfig.batchSize);
-      
-      try {
-        this.logger.debug(`Processing batch ${Math.floor(i / finalConfig.batchSize) + 1}/${Math.ceil(reviews.length / finalConfig.batchSize)}`);
-        
-        const batchResults = await this.labelBatch(batch, finalConfig);
-        results.push(...batchResults);
-        
-        // Small delay between batches to be respectful to API
-        if (i + finalConfig.batchSize < reviews.length) {
-          await new Promise(resolve => setTimeout(resolve, 1000));
+    // Identical review texts (spam, "Great app!") are labeled once and the
+    // result is copied to every duplicate
+    const duplicateGroups = new Map<string, Review[]>();
+    for (const review of reviews) {
+      const key = duplicateKey(review);
+      const group = duplicateGroups.get(key);
+      if (group) {
+        group.push(review);
+      } else {
+        duplicateGroups.set(key, [review]);
+      }
+    }
+
+    const uniqueReviews = [...duplicateGroups.values()].map(group => group[0]!);
+    if (uniqueReviews.length < reviews.length) {
+      this.logger.info(`Deduplicated ${reviews.length} reviews to ${uniqueReviews.length} unique texts`, {
+        duplicatesSkipped: reviews.length - uniqueReviews.length,
+        dedupRatio: Math.round((1 - uniqueReviews.length / reviews.length) * 100) / 100,
+      });
+    }
+
+    // Reviews labeled before with the same prompt and model skip the API.
+    // Blank reviews would all share one key, so they are never cached.
+    const cacheableReviews = finalConfig.useCache
+      ? uniqueReviews.filter(review => normalizeReviewText(review.text) !== '')
+      : [];
+    const cacheKeys = new Map(cacheableReviews.map(review => [review.id, this.getCacheKey(review, finalConfig)]));
+    const cachedResults = await this.getCachedResults(cacheableReviews, cacheKeys);
+    const reviewsToLabel = uniqueReviews.filter(review => !cachedResults.has(review.id));
+
+    if (cachedResults.size > 0) {
+      this.logger.info(`Found cached labels for ${cachedResults.size}/${uniqueReviews.length} unique reviews`);
+    }
+
+    const groupsById = new Map(uniqueReviews.map(review =>
+      [review.id, duplicateGroups.get(duplicateKey(review))!] as const
+    ));
+
+    // Results handed to onResults early are copied to their duplicates too
+    const emitResults = async (labeled: LabelResult[]): Promise<void> => {
+      if (!finalConfig.onResults || labeled.length === 0) {
+        return;
+      }
+      await finalConfig.onResults(labeled.flatMap(result =>
+        (groupsById.get(result.reviewId) ?? []).map(review => ({ ...result, reviewId: review.id }))
+      ));
+    };
+
+    await emitResults([...cachedResults.values()]);
+
+    const batches = this.buildBatches(reviewsToLabel, finalConfig);
+    let newResults: LabelResult[];
+    if (finalConfig.mode === 'batch') {
+      newResults = await this.labelBatchesOffline(batches, finalConfig);
+      await emitResults(newResults);
+    } else {
+      newResults = await this.labelBatchesOnline(batches, finalConfig, emitResults);
+    }
+
+    if (finalConfig.useCache) {
+      await this.cacheResults(newResults, cacheKeys);
+    }
+
+    const resultsById = new Map([
+      ...cachedResults,
+      ...newResults.map(result => [result.reviewId, result] as const),
+    ]);
+    const results = reviews.map(review => {
+      const representative = duplicateGroups.get(duplicateKey(review))![0]!;
+      const result = resultsById.get(representative.id)
+        ?? this.getFallbackResults([representative], finalConfig)[0]!;
+      return { ...result, reviewId: review.id };
+    });
+
+    this.logger.info(`Completed labeling ${results.length} reviews`);
+    return results;
+  }
+
+  /**
+   * Label batches with online requests.
+   * Each lane pulls the next pending batch, so at most `concurrency`
+   * OpenAI requests are in flight while results keep their input order.
+   */
+  private async labelBatchesOnline(
+    batches: Review[][],
+    config: LabelingConfig,
+    onResults: ResultsCallback
+  ): Promise<LabelResult[]> {
+    const batchResults: LabelResult[][] = new Array(batches.length);
+    let nextBatch = 0;
+
+    const runLane = async (): Promise<void> => {
+      while (nextBatch < batches.length) {
+        const index = nextBatch++;
+        batchResults[index] = await this.processBatch(batches[index]!, index, batches.length, config, onResults);
+      }
+    };
+
+    const laneCount = Math.max(1, Math.min(config.concurrency, batches.length));
+    await Promise.all(Array.from({ length: laneCount }, () => runLane()));
+
+    return batchResults.flat();
+  }
+
+  /**
+   * Pack reviews into as few requests as possible: each batch takes reviews
+   * until it holds `batchSize` of them or its estimated review tokens would
+   * pass `targetPromptTokens`, so short reviews share a request and long
+   * ones don't blow the per-request budget
+   */
+  private buildBatches(reviews: Review[], config: LabelingConfig): Review[][] {
+    const batches: Review[][] = [];
+    let current: Review[] = [];
+    let currentTokens = 0;
+
+    for (const review of reviews) {
+      const tokens = estimateTokens(review.text || '') + REVIEW_PROMPT_OVERHEAD_TOKENS;
+
+      if (
+        current.length > 0 &&
+        (current.length >= config.batchSize || currentTokens + tokens > config.targetPromptTokens)
+      ) {
+        batches.push(current);
+        current = [];
+        currentTokens = 0;
+      }
+
+      current.push(review);
+      currentTokens += tokens;
+    }
+
+    if (current.length > 0) {
+      batches.push(current);
+    }
+
+    return batches;
+  }
+
+  /**
+   * Label one batch, retrying transient API failures with exponential backoff
+   * and falling back to default results once retries are exhausted.
+   * Results are passed to onResults once each; a retry after a stream broke
+   * off only re-sends the reviews that had not been labeled yet. A failing
+   * onResults aborts labeling instead of being retried or masked by fallbacks.
+   */
+  private async processBatch(
+    batch: Review[],
+    index: number,
+    total: number,
+    config: LabelingConfig,
+    onResults: ResultsCallback
+  ): Promise<LabelResult[]> {
+    const labeled = new Map<string, LabelResult>();
+    let resultsError: unknown = null;
+    const emit = async (results: LabelResult[]): Promise<void> => {
+      const fresh = results.filter(result => !labeled.has(result.reviewId));
+      for (const result of fresh) {
+        labeled.set(result.reviewId, result);
+      }
+      if (fresh.length > 0) {
+        try {
+          await onResults(fresh);
+        } catch (error) {
+          resultsError = error;
+          throw error;
         }
-        
+      }
+    };
+
+    for (let attempt = 0; ; attempt++) {
+      const remaining = batch.filter(review => !labeled.has(review.id));
+      if (remaining.length === 0) {
+        break; // A stream that broke off after its last result needs no retry
+      }
+
+      try {
+        this.logger.debug(`Processing batch ${index + 1}/${total}`, { attempt, reviews: remaining.length });
+        await emit(await this.labelBatch(remaining, config, emit));
+        break;
       } catch (error) {
-        this.logger.error(`Failed to process batch starting at index ${i}:`, error);
-        
-        // Add failed results for this batch
-        batch.forEach(review => {
-          results.push({
-            reviewId: review.id,
-            theme: 'General Feedback',
-            sentiment: 'neutral',
-            severity: 1,
-            featureRequest: false,
-            directQuote: '',
-            confidence: 0,
-            modelVersion: finalConfig.model,
+        if (resultsError) {
+          throw resultsError;
+        }
+
+        if (labeled.size === batch.length) {
+          break;
+        }
+
+        if (attempt < config.maxRetries && this.isRetryableError(error)) {
+          const delayMs = this.getRetryDelayMs(error, attempt);
+          this.logger.warn(`Batch ${index + 1}/${total} failed, retrying in ${Math.round(delayMs)}ms`, {
+            attempt: attempt + 1,
+            maxRetries: config.maxRetries,
           });
-        });
+          await new Promise(resolve => setTimeout(resolve, delayMs));
+          continue;
+        }
+
+        this.logger.error(`Failed to process batch ${index + 1}/${total}:`, error);
+        await emit(this.getFallbackResults(remaining, config));
+        break;
       }
     }
 
-    this.logger.info(`Completed labeling ${results.length} reviews`);
-    return results;
+    return batch.map(review => labeled.get(review.id)!);
+  }
+
+  /**
+   * Rate limits, server errors and connection failures are worth retrying;
+   * bad requests, auth errors and unparseable output are not
+   */
+  private isRetryableError(error: unknown): boolean {
+    const { status, name } = error as { status?: number; name?: string };
+
+    if (status !== undefined) {
+      return status === 408 || status === 409 || status === 429 || status >= 500;
+    }
+
+    return name === 'APIConnectionError' || name === 'APIConnectionTimeoutError';
+  }
+
+  /**
+   * Full-jitter exponential backoff (1s floor, 60s cap), honouring the
+   * server's retry-after hint on rate limits
+   */
+  private getRetryDelayMs(error: unknown, attempt: number): number {
+    const { status, headers } = error as {
+      status?: number;
+      headers?: Record<string, string | null | undefined>;
+    };
+
+    const retryAfterMs = status === 429 ? parseRetryAfterMs(headers) : undefined;
+    if (retryAfterMs !== undefined) {
+      return Math.min(retryAfterMs, 60000);
+    }
+
+    return Math.max(1000, Math.random() * Math.min(60000, 1000 * 2 ** (attempt + 1)));
+  }
+
+  /**
+   * Default results for reviews whose batch could not be labeled
+   */
+  private getFallbackResults(batch: Review[], config: LabelingConfig): LabelResult[] {
+    return batch.map(review => ({
+      reviewId: review.id,
+      theme: 'General Feedback',
+      sentiment: 'neutral' as const,
+      severity: 1,
+      featureRequest: false,
+      directQuote: '',
+      confidence: 0,
+      modelVersion: config.model,
+    }));
   }
 
   /**
@@ -126,76 +475,187 @@ export class ReviewLabeler {
    */
   private async labelBatch(
     reviews: Review[], 
-    config: LabelingConfig
+    config: LabelingConfig,
+    onResults: ResultsCallback
   ): Promise<LabelResult[]> {
-    // Prepare the prompt with taxonomy and review data
-    const reviewsText = reviews.map((review, index) => 
-      `${index + 1}. ID: ${review.id}\nText: "${review.text}"\n---`
-    ).join('\n');
+    const request = this.buildCompletionRequest(reviews, config);
 
-    const systemPrompt = `You are a meticulous analyst focused on extracting structured data from app reviews. 
+    // Wait for RPM/TPM capacity instead of sleeping a fixed time between batches
+    await this.rateLimiter.acquire(this.estimateRequestTokens(request, reviews.length));
 
-Analyze each review based on this taxonomy:
-${JSON.stringify(this.taxonomy, null, 2)}
+    try {
+      let results: LabelResult[];
+      if (config.stream) {
+        results = await this.streamCompletion(reviews, request, config, onResults);
+      } else {
+        const response = await this.openai.chat.completions.create(request, {
+          timeout: config.timeoutMs,
+        });
+        const message = response.choices[0]?.message;
+        results = this.parseCompletion(reviews, message?.content, message?.refusal, config);
+      }
 
-For EACH review, identify:
-1. ONE primary theme from the taxonomy (use "General Feedback" if none fit)
-2. Sentiment: positive | neutral | negative  
-3. Severity: 1-5 scale (1=minor, 5=critical, use 1 for positive/neutral)
-4. Feature request: true/false (user explicitly suggests adding/improving a feature)
-5. Direct quote: extract 1-20 words that best represent the sentiment
+      this.logger.debug(`Successfully processed batch of ${results.length} reviews`);
+      return results;
 
-Return ONLY a JSON array with this exact structure:
-[
-  {
-    "reviewId": "review_id_here",
-    "theme": "theme_name",
-    "sentiment": "positive|neutral|negative", 
-    "severity": 1-5,
-    "featureRequest": true/false,
-    "directQuote": "exact quote from review",
-    "confidence": 0.0-1.0
+    } catch (error) {
+      const { status, headers } = error as {
+        status?: number;
+        headers?: Record<string, string | null | undefined>;
+      };
+      if (status === 429) {
+        const backoffMs = parseRetryAfterMs(headers) ?? 5000;
+        this.logger.warn(`OpenAI rate limit hit, pausing requests for ${backoffMs}ms`);
+        this.rateLimiter.pause(backoffMs);
+      }
+
+      this.logger.error('OpenAI API call failed:', error);
+      throw error;
+    }
   }
-]`;
 
-    const userPrompt = `Analyze these app reviews:\n\n${reviewsText}`;
+  /**
+   * Stream a completion, handing each result to onResults as soon as its
+   * JSON object has arrived instead of waiting for the whole batch
+   */
+  private async streamCompletion(
+    reviews: Review[],
+    request: OpenAI.Chat.ChatCompletionCreateParamsNonStreaming,
+    config: LabelingConfig,
+    onResults: ResultsCallback
+  ): Promise<LabelResult[]> {
+    const stream = await this.openai.chat.completions.create(
+      { ...request, stream: true },
+      { timeout: config.timeoutMs }
+    );
 
-    try {
-      const response = await this.openai.chat.completions.create({
-        model: config.model,
-        messages: [
-          { role: 'system', content: systemPrompt },
-          { role: 'user', content: userPrompt }
-        ],
-        temperature: 0.1,
-        response_format: { type: 'json_object' }
-      });
+    const parser = new StreamingResultsParser();
+    let content = '';
+    let refusal = '';
 
-      const content = response.choices[0]?.message?.content;
-      if (!content) {
-        throw new Error('Empty response from OpenAI');
+    for await (const chunk of stream) {
+      const delta = chunk.choices[0]?.delta;
+      if (delta?.refusal) {
+        refusal += delta.refusal;
+      }
+      if (!delta?.content) {
+        continue;
       }
 
-      // Parse the JSON response
-      let parsedResponse;
-      try {
-        parsedResponse = JSON.parse(content);
-      } catch (parseError) {
-        this.logger.error('Failed to parse OpenAI response as JSON:', content);
-        throw new Error('Invalid JSON response from OpenAI');
+      content += delta.content;
+      const completed = this.normalizeResults(reviews, parser.push(delta.content), config);
+      if (completed.size > 0) {
+        await onResults([...completed.values()]);
       }
+    }
 
-      // Extract results array (handle both direct array and object with results key)
-      const resultsArray = Array.isArray(parsedResponse) ? parsedResponse : parsedResponse.results;
-      
-      if (!Array.isArray(resultsArray)) {
-        throw new Error('OpenAI response does not contain a results array');
+    return this.parseCompletion(reviews, content, refusal, config);
+  }
+
+  /**
+   * Build the chat completion request for a batch of reviews
+   */
+  private buildCompletionRequest(
+    reviews: Review[],
+    config: LabelingConfig
+  ): OpenAI.Chat.ChatCompletionCreateParamsNonStreaming {
+    // Only the review block varies per batch; the taxonomy lives in the
+    // precomputed system prompt. One JSON object per review escapes quotes
+    // and newlines in review text, and JSON.stringify is V8's native encoder.
+    const reviewsText = reviews.map(review =>
+      JSON.stringify({ id: String(review.id), text: review.text })
+    ).join('\n');
+
+    const userPrompt = USER_PROMPT_HEADER + reviewsText;
+
+    return {
+      model: config.model,
+      messages: [
+        { role: 'system', content: this.systemPrompt },
+        { role: 'user', content: userPrompt }
+      ],
+      temperature: 0.1,
+      response_format: this.responseFormat,
+    };
+  }
+
+  /**
+   * Prompt plus completion budget of a request, for the rate limiter
+   */
+  private estimateRequestTokens(
+    request: OpenAI.Chat.ChatCompletionCreateParamsNonStreaming,
+    reviewCount: number
+  ): number {
+    const userPrompt = request.messages[1]?.content;
+    return this.systemPromptTokens
+      + estimateTokens(typeof userPrompt === 'string' ? userPrompt : '')
+      + reviewCount * OUTPUT_TOKENS_PER_REVIEW;
+  }
+
+  /**
+   * Turn a chat completion's content into one result per review in the batch
+   */
+  private parseCompletion(
+    reviews: Review[],
+    content: string | null | undefined,
+    refusal: string | null | undefined,
+    config: LabelingConfig
+  ): LabelResult[] {
+    if (refusal) {
+      throw new Error(`OpenAI refused to label batch: ${refusal}`);
+    }
+
+    if (!content) {
+      throw new Error('Empty response from OpenAI');
+    }
+
+    // Parse the JSON response
+    let parsedResponse;
+    try {
+      parsedResponse = JSON.parse(content);
+    } catch (parseError) {
+      this.logger.error('Failed to parse OpenAI response as JSON:', content);
+      throw new Error('Invalid JSON response from OpenAI');
+    }
+
+    // The JSON schema guarantees an object with a results array
+    const resultsArray = parsedResponse?.results;
+    if (!Array.isArray(resultsArray)) {
+      throw new Error('OpenAI response does not contain a results array');
+    }
+
+    const resultsById = this.normalizeResults(reviews, resultsArray, config);
+
+    const missing = reviews.filter(review => !resultsById.has(review.id));
+    if (missing.length > 0) {
+      this.logger.warn(`OpenAI returned no label for ${missing.length}/${reviews.length} reviews in batch`);
+    }
+
+    return reviews.map(review =>
+      resultsById.get(review.id) ?? this.getFallbackResults([review], config)[0]!
+    );
+  }
+
+  /**
+   * Index raw model results by review so unknown IDs are dropped and every
+   * review in the batch gets at most one result with validated fields
+   */
+  private normalizeResults(
+    reviews: Review[],
+    rawResults: any[],
+    config: LabelingConfig
+  ): Map<string, LabelResult> {
+    const reviewIds = new Set(reviews.map(review => review.id));
+    const resultsById = new Map<string, LabelResult>();
+    for (const result of rawResults) {
+      const reviewId = String(result?.reviewId ?? '');
+      if (!reviewIds.has(reviewId)) {
+        continue;
       }
 
-      // Validate and clean up results
-      const results: LabelResult[] = resultsArray.map((result: any) => ({
-        reviewId: result.reviewId || '',
-        theme: result.theme || 'General Feedback',
+      resultsById.set(reviewId, {
+        reviewId,
+        theme: this.themeNames.has(result.theme) ? result.theme : 'General Feedback',
         sentiment: ['positive', 'neutral', 'negative'].includes(result.sentiment) 
           ? result.sentiment : 'neutral',
         severity: Math.max(1, Math.min(5, parseInt(result.severity) || 1)),
@@ -203,14 +663,186 @@ Return ONLY a JSON array with this exact structure:
         directQuote: (result.directQuote || '').slice(0, 100), // Limit quote length
         confidence: Math.max(0, Math.min(1, parseFloat(result.confidence) || 0.5)),
         modelVersion: config.model,
-      }));
+      });
+    }
 
-      this.logger.debug(`Successfully processed batch of ${results.length} reviews`);
-      return results;
+    return resultsById;
+  }
+
+  /**
+   * Label batches through the OpenAI Batch API instead of online requests.
+   * Uploads one JSONL request per batch, polls until the job reaches a
+   * terminal state, then parses each response exactly like an online one.
+   * Cheaper and not bound by online RPM limits, at the cost of latency
+   * (up to the 24h completion window).
+   */
+  private async labelBatchesOffline(
+    batches: Review[][],
+    config: LabelingConfig
+  ): Promise<LabelResult[]> {
+    if (batches.length === 0) {
+      return [];
+    }
+
+    const requestLines = batches.map((batch, index) => JSON.stringify({
+      custom_id: `batch-${index}`,
+      method: 'POST',
+      url: '/v1/chat/completions',
+      body: this.buildCompletionRequest(batch, config),
+    }));
+
+    const inputFile = await this.openai.files.create({
+      file: await toFile(Buffer.from(requestLines.join('\n'), 'utf-8'), 'label-requests.jsonl'),
+      purpose: 'batch',
+    }, BATCH_API_REQUEST_OPTIONS);
+
+    let batchJob = await this.openai.batches.create({
+      input_file_id: inputFile.id,
+      endpoint: '/v1/chat/completions',
+      completion_window: '24h',
+    }, BATCH_API_REQUEST_OPTIONS);
+
+    this.logger.info(`Created OpenAI batch ${batchJob.id} for ${batches.length} requests`);
+
+    const terminalStatuses = ['completed', 'failed', 'expired', 'cancelled'];
+    while (!terminalStatuses.includes(batchJob.status)) {
+      await new Promise(resolve => setTimeout(resolve, config.batchPollIntervalMs));
+      batchJob = await this.openai.batches.retrieve(batchJob.id, BATCH_API_REQUEST_OPTIONS);
+
+      this.logger.debug(`OpenAI batch ${batchJob.id} is ${batchJob.status}`, {
+        requestCounts: batchJob.request_counts,
+      });
+    }
+
+    if (batchJob.status !== 'completed') {
+      this.logger.warn(`OpenAI batch ${batchJob.id} ended as ${batchJob.status}`, {
+        errors: batchJob.errors,
+      });
+    }
+
+    // Requests that failed individually are listed in a separate error file
+    if (batchJob.error_file_id) {
+      this.logger.warn(`OpenAI batch ${batchJob.id} has failed requests`, {
+        errorFileId: batchJob.error_file_id,
+        requestCounts: batchJob.request_counts,
+      });
+    }
+
+    // Partial output is still usable for failed/expired batches
+    const responses = new Map<string, OpenAI.Chat.ChatCompletion>();
+    if (batchJob.output_file_id) {
+      const output = await (await this.openai.files.content(batchJob.output_file_id, BATCH_API_REQUEST_OPTIONS)).text();
 
+      for (const line of output.split('\n')) {
+        if (!line.trim()) {
+          continue;
+        }
+
+        // One unreadable line only costs its own batch, which falls back below
+        let entry;
+        try {
+          entry = JSON.parse(line);
+        } catch (error) {
+          this.logger.error(`Skipping unparseable line in output of OpenAI batch ${batchJob.id}:`, error);
+          continue;
+        }
+
+        if (entry.response?.status_code === 200) {
+          responses.set(entry.custom_id, entry.response.body);
+        }
+      }
+    }
+
+    return batches.flatMap((batch, index) => {
+      const response = responses.get(`batch-${index}`);
+      if (!response) {
+        this.logger.error(`OpenAI batch ${batchJob.id} has no result for batch ${index + 1}/${batches.length}`);
+        return this.getFallbackResults(batch, config);
+      }
+
+      try {
+        const message = response.choices[0]?.message;
+        return this.parseCompletion(batch, message?.content, message?.refusal, config);
+      } catch (error) {
+        this.logger.error(`Failed to parse batch ${index + 1}/${batches.length}:`, error);
+        return this.getFallbackResults(batch, config);
+      }
+    });
+  }
+
+  /**
+   * Cache key for a review's labels: hash of the system prompt (which embeds
+   * the taxonomy), the model and the normalized review text
+   */
+  private getCacheKey(review: Review, config: LabelingConfig): string {
+    return this.cacheKeyPrefix
+      .copy()
+      .update(`\0${config.model}\0${normalizeReviewText(review.text)}`)
+      .digest('hex')
+      .slice(0, 24);
+  }
+
+  /**
+   * Look up cached labels for reviews, keyed by review ID.
+   * Cache failures only cost API calls, so they are logged and ignored.
+   */
+  private async getCachedResults(
+    reviews: Review[],
+    cacheKeys: Map<string, string>
+  ): Promise<Map<string, LabelResult>> {
+    const cached = new Map<string, LabelResult>();
+    if (reviews.length === 0) {
+      return cached;
+    }
+
+    try {
+      const result = await this.db.query<{ cache_key: string; labels: Omit<LabelResult, 'reviewId'> }>(`
+        SELECT cache_key, labels FROM label_cache
+        WHERE cache_key = ANY($1)
+      `, [[...new Set(cacheKeys.values())]]);
+
+      const labelsByKey = new Map(result.rows.map(row => [row.cache_key, row.labels]));
+      for (const review of reviews) {
+        const labels = labelsByKey.get(cacheKeys.get(review.id)!);
+        if (labels) {
+          cached.set(review.id, { ...labels, reviewId: review.id });
+        }
+      }
     } catch (error) {
-      this.logger.error('OpenAI API call failed:', error);
-      throw error;
+      // Databases created before label_cache existed need `pnpm db:migrate`
+      this.logger.warn('Failed to read label cache, labeling without it:', error);
+    }
+
+    return cached;
+  }
+
+  /**
+   * Store freshly labeled results in the cache (fallback results are skipped)
+   */
+  private async cacheResults(results: LabelResult[], cacheKeys: Map<string, string>): Promise<void> {
+    const entries = results.filter(result => result.confidence > 0 && cacheKeys.has(result.reviewId));
+    if (entries.length === 0) {
+      return;
+    }
+
+    try {
+      const batchSize = 500;
+      for (let i = 0; i < entries.length; i += batchSize) {
+        const batch = entries.slice(i, i + batchSize);
+        const values = batch.map((_, row) => `($${row * 2 + 1}, $${row * 2 + 2}, NOW())`).join(',\n');
+        const params = batch.flatMap(({ reviewId, ...labels }) => [
+          cacheKeys.get(reviewId)!,
+          JSON.stringify(labels),
+        ]);
+
+        await this.db.query(`
+          INSERT INTO label_cache (cache_key, labels, created_at)
+          VALUES ${values}
+          ON CONFLICT (cache_key) DO NOTHING
+        `, params);
+      }
+    } catch (error) {
+      this.logger.warn('Failed to write label cache:', error);
     }
   }
 
@@ -225,44 +857,51 @@ Return ONLY a JSON array with this exact structure:
     this.logger.info(`Saving ${results.length} label results to database`);
 
     try {
+      // A multi-row upsert can't touch the same review twice, so keep the
+      // latest result per review
+      const uniqueResults = [...new Map(results.map(result => [result.reviewId, result])).values()];
       const batchSize = 50;
       let savedCount = 0;
 
-      for (let i = 0; i < results.length; i += batchSize) {
-        const batch = results.slice(i, i + batchSize);
-        
-        for (const result of batch) {
-          try {
-            await this.db.query(`
-              INSERT INTO labels (
-                id, review_id, sentiment, confidence, theme, severity, 
-                feature_request, direct_quote, model_version, created_at
-              ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, NOW())
-              ON CONFLICT (review_id) DO UPDATE SET
-                sentiment = EXCLUDED.sentiment,
-                confidence = EXCLUDED.confidence,
-                theme = EXCLUDED.theme,
-                severity = EXCLUDED.severity,
-                feature_request = EXCLUDED.feature_request,
-                direct_quote = EXCLUDED.direct_quote,
-                model_version = EXCLUDED.model_version,
-                updated_at = NOW()
-            `, [
-              `label_${Date.now()}_${Math.random().toString(36).slice(2)}`,
-              result.reviewId,
-              result.sentiment,
-              result.confidence,
-              result.theme,
-              result.severity,
-              result.featureRequest,
-              result.directQuote,
-              result.modelVersion
-            ]);
-            savedCount++;
-          } catch (error) {
-            this.logger.error(`Failed to save label for review ${result.reviewId}:`, error);
-          }
-        }
+      // One INSERT per chunk instead of one round-trip per label
+      for (let i = 0; i < uniqueResults.length; i += batchSize) {
+        const batch = uniqueResults.slice(i, i + batchSize);
+        const columnsPerRow = 9;
+
+        const values = batch.map((_, row) => {
+          const offset = row * columnsPerRow;
+          const placeholders = Array.from({ length: columnsPerRow }, (_, col) => `$${offset + col + 1}`);
+          return `(${placeholders.join(', ')}, NOW())`;
+        }).join(',\n');
+
+        const params = batch.flatMap(result => [
+          `label_${Date.now()}_${Math.random().toString(36).slice(2)}`,
+          result.reviewId,
+          result.sentiment,
+          result.confidence,
+          result.theme,
+          result.severity,
+          result.featureRequest,
+          result.directQuote,
+          result.modelVersion
+        ]);
+
+        const { rowCount } = await this.db.query(`
+          INSERT INTO labels (
+            id, review_id, sentiment, confidence, theme, severity, 
+            feature_request, direct_quote, model_version, created_at
+          ) VALUES ${values}
+          ON CONFLICT (review_id) DO UPDATE SET
+            sentiment = EXCLUDED.sentiment,
+            confidence = EXCLUDED.confidence,
+            theme = EXCLUDED.theme,
+            severity = EXCLUDED.severity,
+            feature_request = EXCLUDED.feature_request,
+            direct_quote = EXCLUDED.direct_quote,
+            model_version = EXCLUDED.model_version,
+            updated_at = NOW()
+        `, params);
+        savedCount += rowCount ?? batch.length;
       }
 
       this.logger.info(`Successfully saved ${savedCount}/${results.length} label results`);
@@ -272,46 +911,63 @@ Return ONLY a JSON array with this exact structure:
     }
   }
 
+  /**
+   * Get the subset of review IDs that already have a real label from `model`.
+   * Fallback labels (confidence 0) and labels from other models don't count,
+   * so failed reviews are retried and relabeling with a new model works.
+   */
+  async getLabeledReviewIds(reviewIds: string[], model: string): Promise<Set<string>> {
+    if (reviewIds.length === 0) {
+      return new Set();
+    }
+
+    try {
+      const result = await this.db.query<{ review_id: string }>(`
+        SELECT review_id FROM labels
+        WHERE review_id = ANY($1) AND confidence > 0 AND model_version = $2
+      `, [reviewIds, model]);
+
+      return new Set(result.rows.map(row => row.review_id));
+    } catch (error) {
+      this.logger.error('Failed to get labeled review IDs:', error);
+      throw error;
+    }
+  }
+
   /**
    * Get reviews that need labeling
    */
   async getUnlabeledReviews(limit: number = 100): Promise<Review[]> {
     try {
       const result = await this.db.query(`
-        SELECT r.* FROM reviews r
+        SELECT ${selectReviewColumns('r')} FROM reviews r
         LEFT JOIN labels l ON r.id = l.review_id
-        WHERE l.review_id IS NULL
+        WHERE l.review_id IS NULL AND ${hasReviewText('r')}
         ORDER BY r.created_at DESC
         LIMIT $1
       `, [limit]);
 
-      return result.rows.map(row => ({
-        id: row.id,
-        userName: row.user_name,
-        userUrl: row.user_url,
-        version: row.version,
-        score: row.score,
-        title: row.title,
-        text: row.text,
-        url: row.url,
-        date: row.date,
-        replyDate: row.reply_date,
-        replyText: row.reply_text,
-        helpfulVotes: row.helpful_votes,
-        country: row.country,
-      }));
+      return result.rows.map(mapReviewRow);
     } catch (error) {
       this.logger.error('Failed to get unlabeled reviews:', error);
       throw error;
     }
   }
 
+  /**
+   * Release pooled OpenAI connections
+   */
+  close(): void {
+    this.httpAgent.destroy();
+  }
+
   /**
    * Load taxonomy from file or return default
    */
   private loadTaxonomy(taxonomyPath?: string): any {
     try {
-      const defaultTaxonomyPath = join(__dirname, '../../config/taxonomy.json');
+      // src/ and dist/ both sit next to the package's config/ directory
+      const defaultTaxonomyPath = join(__dirname, '../config/taxonomy.json');
       const filePath = taxonomyPath || defaultTaxonomyPath;
       
       const taxonomyJson = readFileSync(filePath, 'utf-8');
@@ -328,6 +984,45 @@ Return ONLY a JSON array with this exact structure:
     }
   }
 
+  /**
+   * Static system prompt (instructions, taxonomy, rules), built once.
+   * Keeping it byte-identical across batches, ahead of the per-batch reviews,
+   * lets OpenAI's automatic prompt caching reuse the prefix.
+   */
+  private buildSystemPrompt(): string {
+    return SYSTEM_PROMPT_HEADER + this.taxonomyJson + SYSTEM_PROMPT_RULES;
+  }
+
+  /**
+   * JSON schema for Structured Outputs, restricting themes to the taxonomy
+   */
+  private buildResponseSchema(): Record<string, unknown> {
+    return {
+      type: 'object',
+      properties: {
+        results: {
+          type: 'array',
+          items: {
+            type: 'object',
+            properties: {
+              reviewId: { type: 'string' },
+              theme: { type: 'string', enum: [...this.themeNames] },
+              sentiment: { type: 'string', enum: ['positive', 'neutral', 'negative'] },
+              severity: { type: 'integer', enum: [1, 2, 3, 4, 5] },
+              featureRequest: { type: 'boolean' },
+              directQuote: { type: 'string' },
+              confidence: { type: 'number' },
+            },
+            required: ['reviewId', 'theme', 'sentiment', 'severity', 'featureRequest', 'directQuote', 'confidence'],
+            additionalProperties: false,
+          },
+        },
+      },
+      required: ['results'],
+      additionalProperties: false,
+    };
+  }
+
   /**
    * Default taxonomy (fallback)
    */
@@ -209,6 +209,7 @@ export class BullMQLabelerWorker {
     try {
       // Close the worker gracefully
       await this.worker.close();
+      this.labelerWorker.close();
       this.logger.info('BullMQ labeler worker shutdown completed');
     } catch (error) {
       this.logger.error('Error during worker shutdown:', error);
@@ -0,0 +1,137 @@
+/**
+ * Limits for the OpenAI account the labeler runs against
+ */
+export interface RateLimiterConfig {
+  maxRequestsPerMinute: number;
+  maxTokensPerMinute: number;
+}
+
+/**
+ * Rough completion budget per review in a batch (one JSON result object)
+ */
+export const OUTPUT_TOKENS_PER_REVIEW = 60;
+
+/**
+ * Estimate the token count of a prompt.
+ * Uses the ~4 characters per token rule of thumb for OpenAI tokenizers,
+ * which is close enough for budgeting against TPM limits.
+ */
+export function estimateTokens(text: string): number {
+  return Math.ceil(text.length / 4);
+}
+
+/**
+ * Parse how long OpenAI asks us to back off from rate limit response headers.
+ * Understands `retry-after-ms`, `retry-after` (seconds) and the
+ * `x-ratelimit-reset-*` durations (e.g. "1s", "6m0s", "250ms").
+ * Returns undefined when no usable header is present.
+ */
+export function parseRetryAfterMs(
+  headers: Record<string, string | null | undefined> | undefined
+): number | undefined {
+  if (!headers) {
+    return undefined;
+  }
+
+  const retryAfterMs = parseFloat(headers['retry-after-ms'] ?? '');
+  if (!isNaN(retryAfterMs)) {
+    return retryAfterMs;
+  }
+
+  const retryAfter = parseFloat(headers['retry-after'] ?? '');
+  if (!isNaN(retryAfter)) {
+    return retryAfter * 1000;
+  }
+
+  const resets = [headers['x-ratelimit-reset-requests'], headers['x-ratelimit-reset-tokens']]
+    .map(value => (value ? parseDuration(value) : undefined))
+    .filter((value): value is number => value !== undefined);
+
+  return resets.length > 0 ? Math.max(...resets) : undefined;
+}
+
+/**
+ * Parse Go-style durations as used by OpenAI's rate limit headers
+ */
+function parseDuration(value: string): number | undefined {
+  const units: Record<string, number> = { h: 3600000, m: 60000, s: 1000, ms: 1 };
+  const parts = [...value.matchAll(/(\d+(?:\.\d+)?)(ms|h|m|s)/g)];
+
+  if (parts.length === 0) {
+    return undefined;
+  }
+
+  return parts.reduce((total, [, amount, unit]) => total + parseFloat(amount!) * units[unit!]!, 0);
+}
+
+/**
+ * Token-bucket rate limiter for OpenAI requests.
+ * Tracks request and token capacity separately, both refilling continuously
+ * at their per-minute limits, and only lets a request through once both
+ * buckets can cover it. A 429 empties the buckets and pauses dispatch for
+ * however long the API asked.
+ */
+export class OpenAIRateLimiter {
+  private readonly config: RateLimiterConfig;
+  private availableRequests: number;
+  private availableTokens: number;
+  private lastUpdateTime: number;
+  private pausedUntil = 0;
+
+  constructor(config: RateLimiterConfig) {
+    this.config = config;
+    this.availableRequests = config.maxRequestsPerMinute;
+    this.availableTokens = config.maxTokensPerMinute;
+    this.lastUpdateTime = Date.now();
+  }
+
+  /**
+   * Wait until a request costing `tokens` can be dispatched, then reserve it
+   */
+  async acquire(tokens: number): Promise<void> {
+    // A single request larger than the whole bucket would otherwise wait forever
+    const cost = Math.min(tokens, this.config.maxTokensPerMinute);
+
+    for (;;) {
+      this.refill();
+
+      const now = Date.now();
+      if (now >= this.pausedUntil && this.availableRequests >= 1 && this.availableTokens >= cost) {
+        this.availableRequests -= 1;
+        this.availableTokens -= cost;
+        return;
+      }
+
+      const requestWait = ((1 - this.availableRequests) / this.config.maxRequestsPerMinute) * 60000;
+      const tokenWait = ((cost - this.availableTokens) / this.config.maxTokensPerMinute) * 60000;
+      const waitMs = Math.max(this.pausedUntil - now, requestWait, tokenWait, 10);
+
+      await new Promise(resolve => setTimeout(resolve, waitMs));
+    }
+  }
+
+  /**
+   * Back off after a 429: drain both buckets and stop dispatching for `ms`
+   */
+  pause(ms: number): void {
+    this.refill();
+    this.availableRequests = 0;
+    this.availableTokens = 0;
+    this.pausedUntil = Math.max(this.pausedUntil, Date.now() + ms);
+  }
+
+  private refill(): void {
+    const now = Date.now();
+    const elapsedMinutes = (now - this.lastUpdateTime) / 60000;
+    this.lastUpdateTime = now;
+
+    this.availableRequests = Math.min(
+      this.config.maxRequestsPerMinute,
+      this.availableRequests + elapsedMinutes * this.config.maxRequestsPerMinute
+    );
+    this.availableTokens = Math.min(
+      this.config.maxTokensPerMinute,
+      this.availableTokens + elapsedMinutes * this.config.maxTokensPerMinute
+    );
+  }
+}
@@ -0,0 +1,77 @@
+import type { LabelResult } from './labeler.js';
+
+/**
+ * Single consumer for label results produced by concurrent batches.
+ * Batches hand their results over with write() and carry on with the next
+ * API call; one drain loop owns the database writes, coalescing everything
+ * queued since its last write into one save. Writes never contend with each
+ * other and overlap with the requests still in flight.
+ */
+export class LabelResultWriter {
+  private pending: LabelResult[] = [];
+  private draining: Promise<void> | null = null;
+  private error: unknown = null;
+  private readonly save: (results: LabelResult[]) => Promise<void>;
+  private readonly maxPending: number;
+
+  constructor(
+    save: (results: LabelResult[]) => Promise<void>,
+    maxPending: number = 1000 // Producers wait once this many results are queued
+  ) {
+    this.save = save;
+    this.maxPending = maxPending;
+  }
+
+  /**
+   * Queue results for writing.
+   * Only waits when the writer has fallen behind by `maxPending` results.
+   * Rejects with the first write failure once one has happened, so producers
+   * stop labeling reviews whose results could not be stored.
+   */
+  async write(results: LabelResult[]): Promise<void> {
+    if (this.error) {
+      throw this.error;
+    }
+
+    if (results.length === 0) {
+      return;
+    }
+
+    this.pending.push(...results);
+    this.draining ??= this.drain();
+
+    if (this.pending.length >= this.maxPending) {
+      await this.draining;
+
+      if (this.error) {
+        throw this.error;
+      }
+    }
+  }
+
+  /**
+   * Wait for every queued result to be written, rethrowing the first write failure
+   */
+  async close(): Promise<void> {
+    await this.draining;
+
+    if (this.error) {
+      throw this.error;
+    }
+  }
+
+  private async drain(): Promise<void> {
+    try {
+      while (this.pending.length > 0) {
+        const results = this.pending;
+        this.pending = [];
+        await this.save(results);
+      }
+    } catch (error) {
+      this.error = error;
+      this.pending = [];
+    } finally {
+      this.draining = null;
+    }
+  }
+}
@@ -0,0 +1,91 @@
+import { Review } from '@review-scraper/shared';
+
+/**
+ * Columns of the reviews table the labeler actually reads.
+ * Selecting these explicitly (instead of `SELECT *`) keeps audit columns
+ * like created_at/updated_at and app_id off the wire.
+ */
+export const REVIEW_COLUMNS = [
+  'id',
+  'user_name',
+  'user_url',
+  'version',
+  'score',
+  'title',
+  'text',
+  'url',
+  'date',
+  'reply_date',
+  'reply_text',
+  'helpful_votes',
+  'country',
+] as const;
+
+/**
+ * Comma-separated review column list for a SELECT, optionally table-qualified
+ */
+export function selectReviewColumns(alias?: string): string {
+  return REVIEW_COLUMNS.map(column => (alias ? `${alias}.${column}` : column)).join(', ');
+}
+
+/**
+ * SQL predicate for reviews worth labeling: ones with non-blank text.
+ * Filtering in the query means empty reviews never leave the database
+ * instead of being checked row by row after loading.
+ */
+export function hasReviewText(alias?: string): string {
+  return `btrim(coalesce(${alias ? `${alias}.text` : 'text'}, '')) <> ''`;
+}
+
+/**
+ * Bound on interned values, so a column that turns out to be high
+ * cardinality can't grow the pool without limit
+ */
+export const MAX_INTERNED_STRINGS = 10000;
+
+const internedStrings = new Map<string, string>();
+
+/**
+ * Return one shared copy of a low-cardinality column value.
+ * The pg driver allocates a new string per row, so without this every
+ * review in memory carries its own "US" or "3.4.1". Never use this for
+ * free text like titles or review bodies.
+ */
+export function internString<T extends string | null | undefined>(value: T): T {
+  if (typeof value !== 'string') {
+    return value;
+  }
+
+  const interned = internedStrings.get(value);
+  if (interned !== undefined) {
+    return interned as T;
+  }
+
+  if (internedStrings.size < MAX_INTERNED_STRINGS) {
+    internedStrings.set(value, value);
+  }
+  return value;
+}
+
+/**
+ * Map a reviews table row to a Review.
+ * Every field is always assigned in the same order so all reviews share
+ * one hidden class in V8.
+ */
+export function mapReviewRow(row: any): Review {
+  return {
+    id: row.id,
+    userName: row.user_name,
+    userUrl: row.user_url,
+    version: internString(row.version),
+    score: row.score,
+    title: row.title,
+    text: row.text,
+    url: row.url,
+    date: row.date,
+    replyDate: row.reply_date,
+    replyText: row.reply_text,
+    helpfulVotes: row.helpful_votes,
+    country: internString(row.country),
+  };
+}
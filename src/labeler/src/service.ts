@@ -102,7 +102,7 @@ export class LabelerService {
     } = {}
   ): Promise<string[]> {
     const jobIds: string[] = [];
-    const batchSize = options.batchSize || 20;
+    const batchSize = options.batchSize || 50;
     
     // Split reviews into batches
     for (let i = 0; i < reviewIds.length; i += batchSize) {
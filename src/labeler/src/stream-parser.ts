@@ -0,0 +1,66 @@
+/**
+ * Incremental parser for streamed `{"results": [...]}` completions.
+ * Feed it content deltas as they arrive and it returns each element of the
+ * results array as soon as that element's closing brace has streamed in,
+ * so results can be used before the whole completion is done.
+ * Relies on the Structured Outputs schema: a root object whose only array
+ * holds one flat object per review.
+ */
+export class StreamingResultsParser {
+  private buffer = '';
+  private scanned = 0;
+  private depth = 0;
+  private inString = false;
+  private escaped = false;
+  private elementStart = -1;
+
+  /**
+   * Append a content delta and return any results it completed
+   */
+  push(chunk: string): unknown[] {
+    this.buffer += chunk;
+    const completed: unknown[] = [];
+
+    for (let i = this.scanned; i < this.buffer.length; i++) {
+      const char = this.buffer[i];
+
+      if (this.inString) {
+        if (this.escaped) {
+          this.escaped = false;
+        } else if (char === '\\') {
+          this.escaped = true;
+        } else if (char === '"') {
+          this.inString = false;
+        }
+        continue;
+      }
+
+      if (char === '"') {
+        this.inString = true;
+      } else if (char === '{' || char === '[') {
+        // Depth 2 is inside the results array of the root object
+        if (char === '{' && this.depth === 2) {
+          this.elementStart = i;
+        }
+        this.depth++;
+      } else if (char === '}' || char === ']') {
+        this.depth--;
+        if (char === '}' && this.depth === 2 && this.elementStart >= 0) {
+          completed.push(JSON.parse(this.buffer.slice(this.elementStart, i + 1)));
+          this.elementStart = -1;
+        }
+      }
+    }
+
+    // Only an unfinished element still needs its text
+    if (this.elementStart >= 0) {
+      this.buffer = this.buffer.slice(this.elementStart);
+      this.elementStart = 0;
+    } else {
+      this.buffer = '';
+    }
+    this.scanned = this.buffer.length;
+
+    return completed;
+  }
+}
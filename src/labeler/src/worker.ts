@@ -9,6 +9,8 @@ import {
   Review
 } from '@review-scraper/shared';
 import { ReviewLabeler, LabelResult } from './labeler.js';
+import { hasReviewText, mapReviewRow, selectReviewColumns } from './review-rows.js';
+import { LabelResultWriter } from './result-writer.js';
 
 /**
  * Worker-based labeler that processes LABEL_REVIEWS jobs from the queue
@@ -29,7 +31,12 @@ export class LabelerWorker {
       throw new Error('OPENAI_API_KEY environment variable is required');
     }
     
-    this.labeler = new ReviewLabeler({ apiKey });
+    this.labeler = new ReviewLabeler({
+      apiKey,
+      maxRequestsPerMinute: parseInt(process.env.OPENAI_MAX_RPM || '') || undefined,
+      maxTokensPerMinute: parseInt(process.env.OPENAI_MAX_TPM || '') || undefined,
+      compressRequests: process.env.OPENAI_GZIP_REQUESTS === 'true',
+    });
   }
 
   /**
@@ -54,23 +61,36 @@ export class LabelerWorker {
       // Fetch reviews from database
       const reviews = await this.fetchReviewsByIds(reviewIds);
       if (reviews.length === 0) {
-        throw new Error(`No reviews found for provided IDs: ${reviewIds.slice(0, 5).join(', ')}...`);
+        // Blank reviews are filtered out by the query, so this covers both
+        throw new Error(`No reviews found with non-empty text for provided IDs: ${reviewIds.slice(0, 5).join(', ')}...`);
       }
 
+      // Skip reviews this model already labeled for real, so re-running a
+      // job doesn't pay for the same API calls twice
+      const labeledIds = await this.labeler.getLabeledReviewIds(
+        reviews.map(review => review.id),
+        model || 'gpt-4o-mini'
+      );
+      const pendingReviews = reviews.filter(review => !labeledIds.has(review.id));
+
       await job.updateProgress(20);
       
-      this.logger.info(`Found ${reviews.length}/${reviewIds.length} reviews to label`);
+      this.logger.info(`Found ${reviews.length}/${reviewIds.length} reviews, ${pendingReviews.length} still need labeling`);
 
-      // Process reviews with sentiment analysis
-      const labelResults = await this.labeler.labelReviews(reviews, {
-        batchSize: batchSize || 20,
+      // Process reviews with sentiment analysis, saving each batch's
+      // results while later batches are still being labeled
+      const writer = this.createResultWriter();
+      const labelResults = await this.labeler.labelReviews(pendingReviews, {
+        batchSize: batchSize || 50,
         model: model || 'gpt-4o-mini',
+        stream: process.env.OPENAI_STREAM_RESPONSES === 'true',
+        onResults: results => writer.write(results),
       });
 
       await job.updateProgress(80);
 
-      // Save results to database
-      await this.labeler.saveLabelResults(labelResults);
+      // Wait for the remaining results to reach the database
+      await writer.close();
       await job.updateProgress(95);
 
       // Job completed successfully
@@ -124,36 +144,35 @@ export class LabelerWorker {
     }
 
     try {
-      // Create placeholders for parameterized query
-      const placeholders = reviewIds.map((_, i) => `$${i + 1}`).join(', ');
-      
+      // Single array parameter instead of one placeholder per ID; reviews
+      // without text are dropped by the query rather than checked per row
       const result = await this.db.query(`
-        SELECT * FROM reviews 
-        WHERE id IN (${placeholders})
+        SELECT ${selectReviewColumns()} FROM reviews 
+        WHERE id = ANY($1) AND ${hasReviewText()}
         ORDER BY created_at DESC
-      `, reviewIds);
-
-      return result.rows.map(row => ({
-        id: row.id,
-        userName: row.user_name,
-        userUrl: row.user_url,
-        version: row.version,
-        score: row.score,
-        title: row.title,
-        text: row.text,
-        url: row.url,
-        date: row.date,
-        replyDate: row.reply_date,
-        replyText: row.reply_text,
-        helpfulVotes: row.helpful_votes,
-        country: row.country,
-      }));
+      `, [reviewIds]);
+
+      // ANY($1) matches a repeated ID once, so count distinct IDs
+      const requested = new Set(reviewIds).size;
+      const skipped = requested - result.rows.length;
+      if (skipped > 0) {
+        this.logger.info(`Skipped ${skipped}/${requested} requested reviews that are missing or have no text`);
+      }
+
+      return result.rows.map(mapReviewRow);
     } catch (error) {
       this.logger.error('Failed to fetch reviews by IDs:', error);
       throw error;
     }
   }
 
+  /**
+   * Writer that saves results as batches finish instead of all at the end
+   */
+  private createResultWriter(): LabelResultWriter {
+    return new LabelResultWriter(results => this.labeler.saveLabelResults(results));
+  }
+
   /**
    * Calculate average confidence score
    */
@@ -185,11 +204,50 @@ export class LabelerWorker {
     
     try {
       this.logger.info(`Processing up to ${limit} unlabeled reviews`);
-      
-      // Get unlabeled reviews
-      const reviews = await this.labeler.getUnlabeledReviews(limit);
-      
-      if (reviews.length === 0) {
+
+      // Large backfills can go through the cheaper OpenAI Batch API instead
+      // of online requests; each Batch API job can take hours, so that mode
+      // submits everything at once rather than window by window
+      const mode = process.env.LABELER_API_MODE === 'batch' ? 'batch' : 'online';
+      const windowSize = mode === 'batch'
+        ? limit
+        : parseInt(process.env.LABELER_WINDOW_SIZE || '') || 200;
+
+      let reviewsProcessed = 0;
+      let confidenceTotal = 0;
+      const sentimentBreakdown = { positive: 0, neutral: 0, negative: 0 };
+
+      // Only one window of reviews is held in memory at a time. Saved labels
+      // drop out of the unlabeled query, so each fetch returns the next window.
+      while (reviewsProcessed < limit) {
+        const windowLimit = Math.min(windowSize, limit - reviewsProcessed);
+        const reviews = await this.labeler.getUnlabeledReviews(windowLimit);
+        if (reviews.length === 0) {
+          break;
+        }
+
+        const writer = this.createResultWriter();
+        const labelResults = await this.labeler.labelReviews(reviews, {
+          mode,
+          stream: process.env.OPENAI_STREAM_RESPONSES === 'true',
+          onResults: results => writer.write(results),
+        });
+        
+        // Wait for the remaining results to reach the database
+        await writer.close();
+
+        reviewsProcessed += labelResults.length;
+        for (const result of labelResults) {
+          confidenceTotal += result.confidence;
+          sentimentBreakdown[result.sentiment]++;
+        }
+
+        if (reviews.length < windowLimit) {
+          break;
+        }
+      }
+
+      if (reviewsProcessed === 0) {
         return {
           success: true,
           message: 'No unlabeled reviews found',
@@ -199,22 +257,16 @@ export class LabelerWorker {
         };
       }
 
-      // Process with sentiment analysis
-      const labelResults = await this.labeler.labelReviews(reviews);
-      
-      // Save to database
-      await this.labeler.saveLabelResults(labelResults);
-
       const result: JobResult = {
         success: true,
-        message: `Successfully labeled ${labelResults.length} previously unlabeled reviews`,
+        message: `Successfully labeled ${reviewsProcessed} previously unlabeled reviews`,
         data: {
-          reviewsProcessed: labelResults.length,
-          averageConfidence: this.calculateAverageConfidence(labelResults),
-          sentimentBreakdown: this.getSentimentBreakdown(labelResults),
+          reviewsProcessed,
+          averageConfidence: Math.round((confidenceTotal / reviewsProcessed) * 100) / 100,
+          sentimentBreakdown,
         },
         processingTime: Date.now() - startTime,
-        itemsProcessed: labelResults.length,
+        itemsProcessed: reviewsProcessed,
       };
 
       this.logger.info('Completed processing unlabeled reviews', result.data);
@@ -233,6 +285,13 @@ export class LabelerWorker {
     }
   }
 
+  /**
+   * Release resources held by the labeler
+   */
+  close(): void {
+    this.labeler.close();
+  }
+
   /**
    * Get worker concurrency settings based on environment
    */
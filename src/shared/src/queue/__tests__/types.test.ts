@@ -101,7 +101,7 @@ describe('Job Types', () => {
       };
 
       const result = LabelReviewsJobSchema.parse(minimalJob);
-      expect(result.batchSize).toBe(20);
+      expect(result.batchSize).toBe(50);
       expect(result.model).toBe('gpt-4.1-mini');
       expect(result.priority).toBe(5);
     });
@@ -43,7 +43,7 @@ export type ScrapeReviewsJob = z.infer<typeof ScrapeReviewsJobSchema>;
  */
 export const LabelReviewsJobSchema = z.object({
   reviewIds: z.array(z.string().min(1)).min(1, 'At least one review ID is required'),
-  batchSize: z.number().int().min(1).max(100).default(20),
+  batchSize: z.number().int().min(1).max(100).default(50),
   model: z.string().default('gpt-4.1-mini'),
   taxonomyPath: z.string().optional(),
   correlationId: z.string().uuid().optional(),